@@ -0,0 +1,64 @@
+"""
+Helpers for benchmarks: run the mock Workday API / the LOA MCP server on a
+free local port.
+"""
+import asyncio
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _serve(app, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+@contextmanager
+def mock_workday_api():
+    """Yields the base URL of a mock Workday API running in a background thread."""
+    from mock_workday_api.app import app
+
+    port = free_port()
+    with _serve(app, port):
+        yield f"http://127.0.0.1:{port}"
+
+
+@contextmanager
+def loa_mcp_server(workday_base_url: str, transport: str = "sse", stateless_http: bool = False):
+    """
+    Yields the URL of mcp_server.server_sse running in a background thread
+    against the given Workday API. Set SQLITE_PATH before calling.
+    transport: "sse" or "streamable-http".
+    """
+    from shared.settings import settings
+
+    settings.workday_api_base_url = workday_base_url  # read when server_sse is imported
+    from mcp_server import server_sse
+
+    # Own thread: callers may already be inside an event loop.
+    init = threading.Thread(target=lambda: asyncio.run(server_sse.init_db()))
+    init.start()
+    init.join()
+    port = free_port()
+    path = "/mcp" if transport == "streamable-http" else "/sse"
+    extra = {"stateless_http": stateless_http} if transport == "streamable-http" else {}
+    with _serve(server_sse.mcp.http_app(path=path, transport=transport, **extra), port):
+        yield f"http://127.0.0.1:{port}{path}"
@@ -0,0 +1,64 @@
+"""
+Bytes per checkpoint and serialize / deserialize time:
+v1 AgentState (pydantic LeaveRequest + tool payloads) with JsonPlusSerializer
+vs v2 AgentState (primitive req, tool payloads untracked) with CompactSerializer.
+
+    uv run python benchmarks/bench_checkpoint_state.py [--iterations 20000]
+"""
+import argparse
+import timeit
+from datetime import date
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from agent_app.checkpointer import CompactSerializer
+from agent_app.nodes import STATE_VERSION, dump_req
+from shared.model_schema import LeaveRequest
+
+EMAIL = "alice@company.com"
+REQ = LeaveRequest(
+    employee_email=EMAIL, employee_name="Alice", start_date=date(2026, 3, 3),
+    end_date=date(2026, 3, 6), reason="family",
+)
+COMMON = {
+    "email_from": EMAIL,
+    "email_body": "leave from 3rd March to 6th March 2026",
+    "intent": "create_loa",
+    "transaction_id": "LOA-0123456789",
+    "status": "IN_REVIEW",
+    "ok": True,
+    "message": "Your leave request for 2026-03-03 to 2026-03-06 has been created and is now in review.",
+}
+V1 = {
+    **COMMON,
+    "req": REQ,
+    "validation": {"employee_email": EMAIL, "active": True, "currently_on_leave": False, "ok_to_create_loa": True},
+    "balance": {"employee_email": EMAIL, "balance_days": 12},
+}
+V2 = {**COMMON, "state_version": STATE_VERSION, "req": dump_req(REQ)}
+
+
+def checkpoint(values: dict) -> dict:
+    cp = empty_checkpoint()
+    cp["channel_values"] = values
+    cp["channel_versions"] = {k: f"{i:032}.0" for i, k in enumerate(values)}
+    return cp
+
+
+def measure(label: str, serde, values: dict, iterations: int) -> None:
+    cp = checkpoint(values)
+    typed = serde.dumps_typed(cp)
+    dump_us = timeit.timeit(lambda: serde.dumps_typed(cp), number=iterations) / iterations * 1e6
+    load_us = timeit.timeit(lambda: serde.loads_typed(typed), number=iterations) / iterations * 1e6
+    print(f"{label:<22} type={typed[0]:<16} bytes={len(typed[1]):>5} "
+          f"dumps={dump_us:6.1f}us loads={load_us:6.1f}us")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=20_000)
+    n = ap.parse_args().iterations
+    measure("v1 state + jsonplus", JsonPlusSerializer(), V1, n)
+    measure("v2 state + jsonplus", JsonPlusSerializer(), V2, n)
+    measure("v2 state + compact", CompactSerializer(), V2, n)
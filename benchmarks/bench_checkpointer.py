@@ -0,0 +1,83 @@
+"""
+Per-step checkpoint write cost: InMemorySaver vs the durable SQLite saver,
+across many threads, plus the cost of a retention pass.
+
+    uv run python benchmarks/bench_checkpointer.py [--threads 10000] [--steps 3]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.base.id import uuid6
+
+from agent_app.checkpointer import open_checkpointer, close_checkpointer
+from shared.model_schema import LeaveRequest
+from shared.settings import settings
+
+
+def state(i: int) -> dict:
+    # Roughly what AgentState holds after a create_loa turn.
+    email = f"user{i}@company.com"
+    return {
+        "email_from": email,
+        "email_body": "leave from 3rd March to 6th March 2026",
+        "intent": "create_loa",
+        "req": LeaveRequest(employee_email=email, start_date=date(2026, 3, 3), end_date=date(2026, 3, 6)),
+        "validation": {"employee_email": email, "active": True, "currently_on_leave": False, "ok_to_create_loa": True},
+        "balance": {"employee_email": email, "balance_days": 12},
+        "transaction_id": "LOA-0123456789",
+        "status": "IN_REVIEW",
+        "ok": True,
+        "message": "Your leave request for 2026-03-03 to 2026-03-06 has been created and is now in review.",
+    }
+
+
+async def run(backend: str, threads: int, steps: int) -> None:
+    settings.checkpointer_backend = backend
+    settings.checkpoint_maintenance_interval_seconds = 0
+    saver = await open_checkpointer()
+    window = max(1, threads // 5)
+    per_window = []
+    t_window = time.perf_counter()
+    for i in range(threads):
+        config = {"configurable": {"thread_id": f"t{i}", "checkpoint_ns": ""}}
+        values = state(i)
+        for step in range(steps):
+            cp = empty_checkpoint()
+            cp["id"] = str(uuid6(clock_seq=step))
+            cp["channel_values"] = values
+            config = await saver.aput(config, cp, {"source": "loop", "step": step}, {})
+        if (i + 1) % window == 0:
+            per_window.append((time.perf_counter() - t_window) / (window * steps))
+            t_window = time.perf_counter()
+    windows = " ".join(f"{t * 1e6:.0f}" for t in per_window)
+    print(f"{backend:<7} threads={threads} steps={steps} us/checkpoint per window: {windows}")
+
+    if backend == "sqlite":
+        t0 = time.perf_counter()
+        deleted = await saver.prune()
+        await saver.vacuum()
+        size = os.path.getsize(settings.checkpoint_sqlite_path)
+        print(f"sqlite  prune(max {settings.checkpoint_max_per_thread}/thread) + vacuum: "
+              f"{time.perf_counter() - t0:.2f}s {deleted} db={size / 1e6:.1f} MB")
+    await close_checkpointer(saver)
+
+
+async def main(threads: int, steps: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.checkpoint_sqlite_path = os.path.join(tmp, "checkpoints.db")
+        settings.checkpoint_max_per_thread = max(1, steps - 1)
+        await run("memory", threads, steps)
+        await run("sqlite", threads, steps)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=10_000)
+    ap.add_argument("--steps", type=int, default=3)
+    args = ap.parse_args()
+    asyncio.run(main(args.threads, args.steps))
@@ -0,0 +1,69 @@
+"""
+Per-email cost of EmailOutbox.send over a long-lived outbox.
+
+The old writer rewrote the whole file per email (O(n) each, O(n^2) total);
+the buffered append writer should stay flat as the file grows.
+
+    uv run python benchmarks/bench_email_outbox.py [--emails 100000] [--legacy 5000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from shared.email_outbox import EmailOutbox
+
+BODY = "Hi Alice,\n\nYour leave request was created and is in review.\n\nThanks,\nHR Leave Assistant"
+
+
+def legacy_send(path: Path, i: int) -> None:
+    line = f"[ts] TO=alice@company.com SUBJECT=bench {i}\n{BODY}\n{'-' * 80}\n"
+    path.write_text(path.read_text() + line if path.exists() else line, encoding="utf-8")
+
+
+def report(label: str, window_times: list[float], window: int) -> None:
+    per_email = [f"{t / window * 1e6:.1f}" for t in window_times]
+    print(f"{label:<9} us/email per {window}-email window: {' '.join(per_email)}")
+
+
+def main(emails: int, legacy: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        window = max(1, legacy // 5)
+        path = Path(tmp, "legacy.log")
+        times = []
+        for start in range(0, legacy, window):
+            t0 = time.perf_counter()
+            for i in range(start, start + window):
+                legacy_send(path, i)
+            times.append(time.perf_counter() - t0)
+        report("legacy", times, window)
+
+        window = max(1, emails // 10)
+        outbox = EmailOutbox(os.path.join(tmp, "outbox.log"))
+        times = []
+        t_all = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            for start in range(0, emails, window):
+                t0 = time.perf_counter()
+                for i in range(start, start + window):
+                    outbox.send("alice@company.com", f"bench {i}", BODY)
+                times.append(time.perf_counter() - t0)
+                out.seek(0)
+                out.truncate()
+            outbox.flush()
+        total = time.perf_counter() - t_all
+        report("buffered", times, window)
+        size = sum(p.stat().st_size for p in Path(tmp).glob("outbox.log*"))
+        print(f"buffered  {emails} emails written+flushed in {total:.2f}s "
+              f"({emails / total:.0f}/s, {size / 1e6:.1f} MB incl. rotated files)")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=100_000)
+    ap.add_argument("--legacy", type=int, default=5_000)
+    args = ap.parse_args()
+    main(args.emails, args.legacy)
@@ -0,0 +1,75 @@
+"""
+Two-call (classify_intent_llm + extract_leave_request_llm) vs combined
+(classify_and_extract_llm) on create-leave style messages: latency and agreement.
+Calls the real LLM, so OPENAI_API_KEY must be set.
+
+    uv run python benchmarks/bench_intent_modes.py [--rounds 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Every round must reach the LLM: repeats would be answered by the LLM cache.
+os.environ["LLM_CACHE_TTL_SECONDS"] = "0"
+
+from dotenv import load_dotenv  # noqa: E402
+
+from shared.extraction_llm import extract_leave_request_llm  # noqa: E402
+from shared.intent_extraction_llm import classify_and_extract_llm  # noqa: E402
+from shared.intent_llm import classify_intent_llm  # noqa: E402
+
+EMAIL = "alice@company.com"
+MESSAGES = [
+    "leave from 3rd March to 6th March 2026",
+    "Please create an LOA for 2026-04-01 to 2026-04-10, family reasons",
+    "I'd like to take some time off between May 4 and May 8 2026",
+    "what is my leave balance?",
+    "hello there",
+    "Can I request leave? I need next week off",
+]
+
+
+async def two_call(text: str):
+    out = await classify_intent_llm(email_from=EMAIL, text=text)
+    req = None
+    if out.intent == "create_loa":
+        req = await extract_leave_request_llm(email_from=EMAIL, email_body=text)
+    return out.intent, req
+
+
+async def combined(text: str):
+    out = await classify_and_extract_llm(email_from=EMAIL, text=text)
+    return out.intent, out.leave_request
+
+
+def dates(req):
+    return (req.start_date, req.end_date) if req else None
+
+
+async def main(rounds: int) -> None:
+    timings = {"two_call": [], "combined": []}
+    agree_intent = agree_dates = total = 0
+    for _ in range(rounds):
+        for text in MESSAGES:
+            t0 = time.perf_counter()
+            a = await two_call(text)
+            timings["two_call"].append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            b = await combined(text)
+            timings["combined"].append(time.perf_counter() - t0)
+            total += 1
+            agree_intent += a[0] == b[0]
+            agree_dates += dates(a[1]) == dates(b[1])
+    for mode, ts in timings.items():
+        print(f"{mode:<9} mean={statistics.mean(ts) * 1000:.0f}ms "
+              f"median={statistics.median(ts) * 1000:.0f}ms")
+    print(f"agreement: intent {agree_intent}/{total}, dates {agree_dates}/{total}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=3)
+    asyncio.run(main(ap.parse_args().rounds))
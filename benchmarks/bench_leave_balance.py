@@ -0,0 +1,63 @@
+"""
+Many parallel get_leave_balance calls: connect-per-call (old) vs the pooled WAL connections.
+
+    uv run python benchmarks/bench_leave_balance.py [--calls 2000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["SQLITE_PATH"] = os.path.join(_tmp.name, "bench.db")
+
+from mcp_server import server_sse  # noqa: E402  (reads SQLITE_PATH at import)
+from shared.settings import settings  # noqa: E402
+
+EMAILS = ["alice@company.com", "bob@company.com", "amps@company.com"]
+
+
+async def per_call_connection(employee_email: str) -> dict:
+    # The pre-pooling behaviour: a new connection (thread + file open) per request.
+    async with aiosqlite.connect(settings.sqlite_path) as db:
+        async with db.execute(
+            "SELECT balance_days FROM leave_balance WHERE employee_email = ?",
+            (employee_email,),
+        ) as cur:
+            row = await cur.fetchone()
+    return {"employee_email": employee_email, "balance_days": int(row[0]) if row else 0}
+
+
+async def run(label: str, fn, calls: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            await fn(EMAILS[i % len(EMAILS)])
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<10} calls={calls} conc={concurrency} total={elapsed:.3f}s "
+          f"throughput={calls / elapsed:.0f}/s")
+
+
+async def main(calls: int, concurrency: int) -> None:
+    await server_sse.init_db()
+    pooled = getattr(server_sse.get_leave_balance, "fn", server_sse.get_leave_balance)
+    await server_sse.db_pool.open()
+    for conc in (1, concurrency):
+        await run("per-call", per_call_connection, calls, conc)
+        await run("pooled", pooled, calls, conc)
+    await server_sse.db_pool.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=100)
+    args = ap.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,100 @@
+"""
+Hundreds of concurrent create_loa calls against the leave ledger: all for the
+same employee (every debit races on one balance row) and one per employee.
+Workday is replaced by an in-process fake so only the debit path is measured.
+
+    uv run python benchmarks/bench_leave_ledger.py [--calls 300] [--balance 100]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["SQLITE_PATH"] = os.path.join(_tmp.name, "bench.db")
+
+from fastmcp.exceptions import ToolError  # noqa: E402
+
+from mcp_server import ledger, server_sse  # noqa: E402  (reads SQLITE_PATH at import)
+from shared.model_schema import CreateLOAResponse  # noqa: E402
+
+
+async def fake_workday_create_loa(req, **kwargs) -> CreateLOAResponse:
+    await asyncio.sleep(0)
+    return CreateLOAResponse(transaction_id=f"LOA-{uuid.uuid4().hex[:10]}", status="SUBMITTED")
+
+
+async def seed(emails: list[str], balance: int) -> None:
+    async with server_sse.db_pool.acquire() as db:
+        await db.executemany(
+            "INSERT OR REPLACE INTO leave_balance(employee_email, balance_days, version) VALUES (?, ?, 0)",
+            [(e, balance) for e in emails],
+        )
+        await db.executemany(
+            "INSERT INTO leave_ledger(employee_email, kind, delta_days, balance_after) VALUES (?, 'opening', ?, ?)",
+            [(e, balance, balance) for e in emails],
+        )
+        await db.commit()
+
+
+async def consistent(emails: list[str]) -> bool:
+    """Each materialized balance equals the sum of its ledger deltas."""
+    async with server_sse.db_pool.acquire() as db:
+        async with db.execute(
+            "SELECT COUNT(*) FROM leave_balance b WHERE b.employee_email IN (SELECT value FROM json_each(?)) "
+            "AND b.balance_days != (SELECT SUM(delta_days) FROM leave_ledger l WHERE l.employee_email = b.employee_email)",
+            (json.dumps(emails),),
+        ) as cur:
+            (bad,) = await cur.fetchone()
+    return bad == 0
+
+
+async def run(label: str, emails: list[str], balance: int) -> None:
+    create_loa = getattr(server_sse.create_loa, "fn", server_sse.create_loa)
+    await seed(set(emails), balance)
+    ledger.LEDGER_COUNTS.clear()
+    ok = rejected = 0
+
+    async def one(i: int, email: str):
+        nonlocal ok, rejected
+        # 1 day, a different day per call: repeats of the same request would
+        # be answered by the idempotency check instead of debiting.
+        day = (date(2026, 1, 1) + timedelta(days=i)).isoformat()
+        try:
+            await create_loa(email, day, day)
+            ok += 1
+        except ToolError:
+            rejected += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i, e) for i, e in enumerate(emails)))
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{label:<10} calls={len(emails)} total={elapsed:.3f}s throughput={len(emails) / elapsed:.0f}/s "
+        f"ok={ok} rejected={rejected} conflicts={ledger.LEDGER_COUNTS['conflicts']} "
+        f"consistent={await consistent(sorted(set(emails)))}"
+    )
+
+
+async def main(calls: int, balance: int) -> None:
+    await server_sse.init_db()
+    server_sse.workday.create_loa = fake_workday_create_loa
+    await server_sse.db_pool.open()
+    try:
+        # balance < calls: exactly `balance` creates may succeed.
+        await run("same", ["same@company.com"] * calls, balance)
+        await run("different", [f"emp{i}@company.com" for i in range(calls)], balance)
+    finally:
+        await server_sse.db_pool.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--balance", type=int, default=100)
+    args = ap.parse_args()
+    asyncio.run(main(args.calls, args.balance))
@@ -0,0 +1,78 @@
+"""
+classify_intent_llm over a stream of messages where some repeat (resent /
+templated emails), with and without the on-disk LLM cache. The LLM is a fake
+with a fixed latency so the run is repeatable and needs no API key.
+
+    uv run python benchmarks/bench_llm_cache.py [--messages 500] [--distinct 100] [--llm-ms 100]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmp.name, "llm_cache.db")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+import shared.intent_llm as intent_llm  # noqa: E402
+from shared.llm_cache import llm_cache  # noqa: E402
+
+TEMPLATES = [
+    "What is my leave balance?",
+    "Please create leave from 2026-03-{d:02d} to 2026-03-{e:02d}.",
+    "Hi HR,\n\nI'd like to take leave {d} to {e} March 2026.\n\nThanks",
+]
+
+
+def messages(n: int, distinct: int) -> list[tuple[str, str]]:
+    rng = random.Random(7)
+    pool = [
+        (f"emp{i % 40}@company.com", rng.choice(TEMPLATES).format(d=i % 20 + 1, e=i % 20 + 3))
+        for i in range(distinct)
+    ]
+    # Resends differ in spacing / line endings only.
+    return [
+        (email, text if rng.random() < 0.5 else f"  {text}  ".replace("\n", "\r\n"))
+        for email, text in (rng.choice(pool) for _ in range(n))
+    ]
+
+
+async def run(label: str, msgs: list[tuple[str, str]], llm_ms: float) -> None:
+    calls = 0
+
+    async def fake_llm(inputs):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(llm_ms / 1000)
+        return intent_llm.IntentOut(intent="create_loa", confidence=0.9, reason="fake")
+
+    intent_llm._classify = fake_llm
+    t0 = time.perf_counter()
+    for email, text in msgs:
+        await intent_llm.classify_intent_llm(email, text)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<9} messages={len(msgs)} llm_calls={calls} total={elapsed:.2f}s "
+          f"mean={elapsed / len(msgs) * 1000:.1f}ms")
+
+
+async def main(n: int, distinct: int, llm_ms: float) -> None:
+    msgs = messages(n, distinct)
+    ttl = llm_cache.ttl
+    llm_cache.ttl = 0  # disabled
+    await run("no cache", msgs, llm_ms)
+    llm_cache.ttl = ttl
+    await run("cold", msgs, llm_ms)
+    await run("warm", msgs, llm_ms)  # e.g. after a restart: entries are on disk
+    stats = llm_cache.stats()
+    print(f"hit_rate={stats['hit_rate']} size={stats['size']}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=500)
+    ap.add_argument("--distinct", type=int, default=100)
+    ap.add_argument("--llm-ms", type=float, default=100.0)
+    args = ap.parse_args()
+    asyncio.run(main(args.messages, args.distinct, args.llm_ms))
@@ -0,0 +1,65 @@
+"""
+MCP tool calls from the agent: a new session per call (MultiServerMCPClient.get_tools)
+vs the persistent session pool behind call_tool.
+
+    uv run python benchmarks/bench_mcp_sessions.py [--calls 300] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["SQLITE_PATH"] = os.path.join(_tmp.name, "bench.db")
+
+from agent_app.mcpClient import call_tool, close_mcp_tools, mcp_pool_stats  # noqa: E402
+from shared.settings import settings  # noqa: E402
+from _servers import mock_workday_api, loa_mcp_server  # noqa: E402
+
+ARGS = {"employee_email": "alice@company.com"}
+
+
+async def run(label: str, call, calls: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(
+        f"{label:<10} calls={calls} conc={concurrency} "
+        f"mean={statistics.mean(latencies) * 1000:.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms "
+        f"throughput={calls / elapsed:.0f}/s"
+    )
+
+
+async def main(calls: int, concurrency: int) -> None:
+    with mock_workday_api() as workday_url, loa_mcp_server(workday_url) as mcp_url:
+        settings.mcp_sse_url = mcp_url
+        client = MultiServerMCPClient({"loa": {"url": mcp_url, "transport": "sse"}})
+        per_call = {t.name: t for t in await client.get_tools()}["get_leave_balance"]
+        for conc in (1, concurrency):
+            await run("per-call", lambda: per_call.ainvoke(ARGS), calls, conc)
+            await run("pooled", lambda: call_tool("get_leave_balance", ARGS), calls, conc)
+        print("pool:", mcp_pool_stats())
+        await close_mcp_tools()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=20)
+    args = ap.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,77 @@
+"""
+get_leave_balance latency / throughput through call_tool for each
+MCP transport (SSE, streamable HTTP, stateless streamable HTTP, in-process)
+at increasing concurrency.
+
+    uv run python benchmarks/bench_mcp_transports.py [--calls 500] [--levels 1,10,50,100]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["SQLITE_PATH"] = os.path.join(_tmp.name, "bench.db")
+
+from agent_app.mcpClient import call_tool, close_mcp_tools  # noqa: E402
+from shared.settings import settings  # noqa: E402
+from _servers import mock_workday_api, loa_mcp_server  # noqa: E402
+
+ARGS = {"employee_email": "alice@company.com"}
+
+# label -> (transport, stateless_http)
+TRANSPORTS = {
+    "sse": ("sse", False),
+    "http": ("streamable-http", False),
+    "http-stateless": ("streamable-http", True),
+    "in-process": ("in-process", False),  # no server: the agent imports it
+}
+
+
+async def run(label: str, calls: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await call_tool("get_leave_balance", ARGS)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(
+        f"{label:<15} calls={calls} conc={concurrency:<4} "
+        f"mean={statistics.mean(latencies) * 1000:.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms "
+        f"throughput={calls / elapsed:.0f}/s"
+    )
+
+
+async def main(calls: int, levels: list[int]) -> None:
+    with mock_workday_api() as workday_url:
+        for label, (transport, stateless) in TRANSPORTS.items():
+            if transport == "in-process":
+                server = contextlib.nullcontext("")
+            else:
+                server = loa_mcp_server(workday_url, transport, stateless)
+            with server as url:
+                settings.mcp_transport = transport
+                settings.mcp_sse_url = settings.mcp_http_url = url
+                await call_tool("get_leave_balance", ARGS)  # warm up
+                for conc in levels:
+                    await run(label, calls, conc)
+                await close_mcp_tools()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=500)
+    ap.add_argument("--levels", default="1,10,50,100")
+    args = ap.parse_args()
+    asyncio.run(main(args.calls, [int(n) for n in args.levels.split(",")]))
@@ -0,0 +1,103 @@
+"""
+Load test: get_leave_balance throughput against `python -m mcp_server.server_sse`
+with MCP_WORKERS = 1, 2, 4 (streamable HTTP, stateless). Load comes from
+several client processes so the client side isn't the bottleneck.
+Scaling is bounded by the cores on the box.
+
+    uv run python benchmarks/bench_mcp_workers.py [--workers 1,2,4] [--clients 4] [--concurrency 32] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from _servers import free_port
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+ARGS = {"employee_email": "alice@company.com"}
+
+
+def _client(url: str, concurrency: int, seconds: float) -> int:
+    """One load-generating process: returns the number of completed calls."""
+    os.environ.update(MCP_TRANSPORT="streamable-http", MCP_HTTP_URL=url)
+    from agent_app.mcpClient import call_tool, close_mcp_tools
+
+    async def run() -> int:
+        done = 0
+        deadline = time.perf_counter() + seconds
+
+        async def loop():
+            nonlocal done
+            while time.perf_counter() < deadline:
+                await call_tool("get_leave_balance", ARGS)
+                done += 1
+
+        await call_tool("get_leave_balance", ARGS)  # connect before the clock starts
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+        await close_mcp_tools()
+        return done
+
+    return asyncio.run(run())
+
+
+def _wait_ready(url: str, proc: subprocess.Popen) -> None:
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def bench(workers: int, clients: int, concurrency: int, seconds: float, db_path: str) -> None:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    env = {
+        **os.environ,
+        "MCP_TRANSPORT": "streamable-http",
+        "MCP_HTTP_URL": url,
+        "MCP_PORT": str(port),
+        "MCP_WORKERS": str(workers),
+        "SQLITE_PATH": db_path,
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mcp_server.server_sse"],
+        cwd=SRC, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(url, proc)
+        with ProcessPoolExecutor(clients) as pool:
+            counts = list(pool.map(_client, [url] * clients, [concurrency] * clients, [seconds] * clients))
+        total = sum(counts)
+        print(f"workers={workers} clients={clients}x{concurrency} calls={total} throughput={total / seconds:.0f}/s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+
+
+def main(workers: list[int], clients: int, concurrency: int, seconds: float) -> None:
+    print(f"cores={os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        for n in workers:
+            bench(n, clients, concurrency, seconds, db_path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--clients", type=int, default=4)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+    main([int(n) for n in args.workers.split(",")], args.clients, args.concurrency, args.seconds)
@@ -0,0 +1,100 @@
+"""
+Decoding MCP tool results in the agent: the old heuristic path (LangChain
+content blocks -> normalize_tool_output -> json.loads -> dict) vs the typed
+path (structured content -> pydantic model), plus the same comparison end to
+end for get_leave_balance over the in-process transport.
+
+    uv run python benchmarks/bench_tool_decode.py [--n 100000] [--calls 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import timeit
+
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import CallToolResult, TextContent
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["SQLITE_PATH"] = os.path.join(_tmp.name, "bench.db")
+os.environ["MCP_TRANSPORT"] = "in-process"
+
+from agent_app import mcpClient  # noqa: E402
+from agent_app.mcpClient import (  # noqa: E402
+    call_tool, close_mcp_tools, decode_tool_result, get_mcp_tool_by_name,
+)
+from shared.model_schema import EmployeeValidation  # noqa: E402
+
+PAYLOAD = {"employee_email": "alice@company.com", "active": True, "currently_on_leave": False, "ok_to_create_loa": True}
+TEXT = json.dumps(PAYLOAD, separators=(",", ":"))
+RESULT = CallToolResult(content=[TextContent(type="text", text=TEXT)], structuredContent=PAYLOAD)
+# What tool.ainvoke() used to hand the graph.
+LC_BLOCKS = [{"type": "text", "text": TEXT, "id": "lc_0"}]
+
+
+def normalize_tool_output(raw):
+    # The pre-typed agent_app.nodes helper, kept here as the baseline.
+    if raw is None:
+        return {}
+    if isinstance(raw, list):
+        return normalize_tool_output(raw[0]) if raw else {}
+    if isinstance(raw, dict) and "content" in raw and isinstance(raw["content"], list) and raw["content"]:
+        return normalize_tool_output(raw["content"][0])
+    if isinstance(raw, dict) and raw.get("type") == "text" and isinstance(raw.get("text"), str):
+        text = raw["text"].strip()
+        try:
+            obj = json.loads(text)
+            return obj if isinstance(obj, dict) else {"value": obj}
+        except json.JSONDecodeError:
+            return {"text": text}
+    if isinstance(raw, dict):
+        for key in ("result", "data", "output"):
+            if key in raw:
+                return normalize_tool_output(raw[key])
+        return raw
+    return {"value": raw}
+
+
+def micro(n: int) -> None:
+    cases = {
+        "normalize (old)": lambda: normalize_tool_output(LC_BLOCKS),
+        "structured": lambda: decode_tool_result("validate_employee", RESULT),
+        "validate_json": lambda: EmployeeValidation.model_validate_json(TEXT),
+    }
+    for label, fn in cases.items():
+        per_call = min(timeit.repeat(fn, number=n, repeat=3)) / n
+        print(f"{label:<16} {per_call * 1e6:.2f}us/decode")
+
+
+async def end_to_end(calls: int) -> None:
+    definition = (await get_mcp_tool_by_name())["get_leave_balance"]
+    # The LangChain wrapper the agent used to call, on the same session pool.
+    async with mcpClient._POOL.session() as session:
+        tool = convert_mcp_tool_to_langchain_tool(
+            session, definition, tool_interceptors=[mcpClient._POOL], server_name="loa"
+        )
+    args = {"employee_email": "alice@company.com"}
+    cases = {
+        "ainvoke+normalize": lambda: tool.ainvoke(args),
+        "call_tool (typed)": lambda: call_tool("get_leave_balance", args),
+    }
+    for label, fn in cases.items():
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            out = await fn()
+            if label.startswith("ainvoke"):
+                normalize_tool_output(out)
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<18} calls={calls} mean={elapsed / calls * 1e6:.0f}us")
+    await close_mcp_tools()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--calls", type=int, default=2000)
+    args = ap.parse_args()
+    micro(args.n)
+    asyncio.run(end_to_end(args.calls))
@@ -0,0 +1,65 @@
+"""
+Per-call httpx.AsyncClient vs the shared pooled client in WorkdayClient.
+
+    uv run python benchmarks/bench_workday_client.py [--calls 500] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from shared.model_schema import EmployeeStatus
+from shared.workday_client import WorkdayClient, close_http_client
+from _servers import mock_workday_api
+
+EMAIL = "alice@company.com"
+
+
+async def per_call_client(base_url: str) -> EmployeeStatus:
+    # The pre-pooling behaviour: a brand-new client (and TCP connection) per request.
+    async with httpx.AsyncClient(timeout=10) as client:
+        r = await client.get(f"{base_url}/employees/status", params={"email": EMAIL})
+        r.raise_for_status()
+        return EmployeeStatus(**r.json())
+
+
+async def run(label: str, call, calls: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    print(
+        f"{label:<12} calls={calls} conc={concurrency} "
+        f"mean={statistics.mean(latencies) * 1000:.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}ms "
+        f"throughput={calls / elapsed:.0f}/s"
+    )
+
+
+async def main(calls: int, concurrency: int) -> None:
+    with mock_workday_api() as base_url:
+        pooled = WorkdayClient(base_url)
+        await pooled.get_employee_status(EMAIL)  # warm the pool
+        for conc in (1, concurrency):
+            await run("per-call", lambda: per_call_client(base_url), calls, conc)
+            await run("pooled", lambda: pooled.get_employee_status(EMAIL), calls, conc)
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=500)
+    ap.add_argument("--concurrency", type=int, default=20)
+    args = ap.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -3,16 +3,20 @@ import asyncio
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, END
 from agent_app.nodes import (
-    AgentState,node_extract,node_validate,node_balance,node_create_loa,
+    AgentState,node_extract,node_check_duplicate,node_validate,node_balance,node_join,node_create_loa,
     node_email_success,node_email_failure,
     node_reply_balance,
     route_after_intent,
     node_route_intent,
     route_after_balance,
+    route_after_check_duplicate,
     route_after_create_loa
     )
 
-from langgraph.checkpoint.memory import InMemorySaver
+from agent_app.streaming import stream_turn
+from agent_app.checkpointer import open_checkpointer, close_checkpointer
+from agent_app.mcpClient import close_mcp_tools
+from shared.settings import settings
 
 load_dotenv() 
 
@@ -21,8 +25,10 @@ def build_graph(checkpointer):
     #Nodes 
     g.add_node("route_intent", node_route_intent)
     g.add_node("extract", node_extract)
+    g.add_node("check_duplicate", node_check_duplicate)
     g.add_node("validate", node_validate)
     g.add_node("balance", node_balance)
+    g.add_node("join", node_join)
     g.add_node("reply_balance", node_reply_balance)
     g.add_node("create_loa", node_create_loa)
     g.add_node("email_success", node_email_success)
@@ -33,13 +39,23 @@ def build_graph(checkpointer):
     g.add_conditional_edges(
         "route_intent",
         route_after_intent,
-        {"validate": "validate", "extract": "extract", "email_failure": "email_failure"},
+        {
+            "validate": "validate", "balance": "balance", "extract": "extract",
+            "check_duplicate": "check_duplicate", "email_failure": "email_failure",
+        },
     )
 
-    g.add_edge("extract", "validate")
-    g.add_edge("validate", "balance")
+    # A repeated request ends here with the existing transaction; otherwise
+    # validate and balance are independent MCP calls: fan out, then join
+    g.add_edge("extract", "check_duplicate")
     g.add_conditional_edges(
-        "balance",
+        "check_duplicate",
+        route_after_check_duplicate,
+        {"done": END, "validate": "validate", "balance": "balance"},
+    )
+    g.add_edge(["validate", "balance"], "join")
+    g.add_conditional_edges(
+        "join",
         route_after_balance,
         {"reply_balance": "reply_balance", "create_loa": "create_loa", "email_failure": "email_failure"},
     )
@@ -54,10 +70,37 @@ def build_graph(checkpointer):
     return g.compile(checkpointer=checkpointer)
 
 
+async def _stream_to_console(app, inputs, config) -> dict:
+    streamed = False
+    async for kind, value in stream_turn(app, inputs, config):
+        if kind == "node":
+            print(f"[progress] {value}", flush=True)
+        elif kind == "token":
+            if not streamed:
+                print("\nassistant: ", end="", flush=True)
+                streamed = True
+            print(value, end="", flush=True)
+        elif kind == "reset":
+            if streamed:
+                print("\n[progress] rewriting reply", flush=True)
+                streamed = False
+        else:
+            if not streamed and value.get("message"):
+                print("\nassistant:", value.get("message"), end="")
+            print()
+            return value
+
+
 async def main():
-    checkpointer = InMemorySaver()
-    app = build_graph(checkpointer)
+    checkpointer = await open_checkpointer()
+    try:
+        await _chat_loop(build_graph(checkpointer))
+    finally:
+        await close_mcp_tools()
+        await close_checkpointer(checkpointer)
+
 
+async def _chat_loop(app):
     thread_id = input("Enter your email Id: ").strip()
 
     while True:
@@ -65,9 +108,12 @@ async def main():
         if message.lower() in ("quite" ,"exit"):
             break
         email_from=thread_id
-        result = await app.ainvoke(
-            {"email_from": email_from, "email_body": message},
-           config={"configurable": {"thread_id": thread_id}},)
+        inputs = {"email_from": email_from, "email_body": message}
+        config = {"configurable": {"thread_id": thread_id}}
+        if settings.stream_responses:
+            result = await _stream_to_console(app, inputs, config)
+        else:
+            result = await app.ainvoke(inputs, config=config)
         print("\n=== FINAL RESULT ===",result)
         print("ok:", result.get("ok"))
         print("message:", result.get("message"))
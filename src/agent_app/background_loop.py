@@ -0,0 +1,62 @@
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterable, Awaitable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class BackgroundLoop:
+    """
+    One long-lived event loop on a daemon thread.
+
+    Sync callers (Streamlit reruns) submit coroutines to it instead of
+    calling asyncio.run per message, so loop-bound resources - the MCP tool
+    cache, pooled HTTP clients, the shared LLM client - survive across turns
+    and browser sessions.
+    """
+
+    def __init__(self, name: str = "agent-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Awaitable[T], timeout: float | None = None) -> T:
+        """Run a coroutine on the loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def iterate(self, aiterable: AsyncIterable[T]) -> Iterator[T]:
+        """
+        Consume an async iterator on the loop, yielding its items to the
+        calling thread as they arrive (so the caller can render them).
+        """
+        items: queue.Queue[Any] = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in aiterable:
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+                raise
+            finally:
+                items.put(_DONE)
+
+        fut = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not fut.done():
+                fut.cancel()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,225 @@
+"""
+Bulk ingestion: run the LOA graph over a mailbox file.
+
+    python -m agent_app.batch inbox.mbox
+    python -m agent_app.batch requests.jsonl --concurrency 32 --quiet
+
+Input is an mbox file or JSONL, one {"id", "from", "body"} object per line
+("email_from" / "email_body" also accepted). Messages are streamed from the
+file, settings.batch_concurrency at a time, with separate caps on LLM and
+MCP calls (see shared/call_limits.py).
+
+Each finished message is appended to <input>.progress.jsonl. A rerun skips
+ids already recorded there, so after a crash it resumes where it stopped;
+only messages that were in flight (or failed with an error) are run again.
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import mailbox
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from email.header import decode_header, make_header
+from email.utils import parseaddr
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from agent_app.agent import build_graph
+from agent_app.mcpClient import get_mcp_tool_by_name, close_mcp_tools
+from shared.call_limits import configure_call_limits
+from shared.email_outbox import EmailOutbox
+from shared.llm_cache import llm_cache
+from shared.settings import settings
+
+
+@dataclass
+class BatchMessage:
+    id: str
+    email_from: str
+    email_body: str
+
+
+def _content_id(email_from: str, body: str) -> str:
+    return hashlib.sha256(f"{email_from}\n{body}".encode()).hexdigest()[:32]
+
+
+def _decode_header(value: str) -> str:
+    return str(make_header(decode_header(value))) if value else ""
+
+
+def _plain_text(msg: mailbox.mboxMessage) -> str:
+    part = next((p for p in msg.walk() if p.get_content_type() == "text/plain"), None)
+    if part is None:
+        return ""
+    payload = part.get_payload(decode=True) or b""
+    return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+
+
+def read_mbox(path: str) -> Iterator[BatchMessage]:
+    for msg in mailbox.mbox(path, create=False):
+        email_from = parseaddr(msg.get("From", ""))[1]
+        subject = _decode_header(msg.get("Subject", ""))
+        body = _plain_text(msg).strip()
+        text = f"{subject}\n\n{body}" if subject else body
+        msg_id = (msg.get("Message-ID") or "").strip() or _content_id(email_from, text)
+        yield BatchMessage(msg_id, email_from, text)
+
+
+def read_jsonl(path: str) -> Iterator[BatchMessage]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            email_from = rec.get("from") or rec.get("email_from") or ""
+            body = rec.get("body") or rec.get("email_body") or ""
+            yield BatchMessage(str(rec.get("id") or _content_id(email_from, body)), email_from, body)
+
+
+def read_messages(path: str, fmt: str = "auto") -> Iterator[BatchMessage]:
+    if fmt == "auto":
+        fmt = "jsonl" if Path(path).suffix.lower() in (".jsonl", ".ndjson", ".json") else "mbox"
+    return read_jsonl(path) if fmt == "jsonl" else read_mbox(path)
+
+
+class ProgressLog:
+    """Append-only record of finished message ids, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.done: set[str] = set()
+        needs_newline = False
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line)["id"])
+                    except (ValueError, KeyError):
+                        pass  # torn last line from a crash
+                    needs_newline = not line.endswith("\n")
+        self._f = self.path.open("a", encoding="utf-8")
+        if needs_newline:
+            self._f.write("\n")
+
+    def record(self, msg_id: str, outcome: str, **extra) -> None:
+        self._f.write(json.dumps({"id": msg_id, "outcome": outcome, **extra}) + "\n")
+        self._f.flush()
+        self.done.add(msg_id)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def outcome_of(result: dict) -> str:
+    if result.get("duplicate"):
+        return "duplicate"
+    if result.get("transaction_id"):
+        return "created"
+    intent = result.get("intent")
+    if intent == "balance":
+        return "balance"
+    if intent == "create_loa":
+        return "rejected"
+    return "unknown"
+
+
+async def run_batch(
+    app,
+    messages: Iterable[BatchMessage],
+    progress: ProgressLog,
+    concurrency: int,
+    report_every: int = 0,
+) -> tuple[Counter, float]:
+    """Returns (per-outcome counts, seconds). "skipped" = already in the progress log."""
+    counts: Counter = Counter()
+    in_flight: set[str] = set()
+    it = iter(messages)
+    started = time.perf_counter()
+
+    def processed() -> int:
+        return sum(n for outcome, n in counts.items() if outcome != "skipped")
+
+    async def worker() -> None:
+        # Workers share one iterator; next() never awaits, so each message
+        # is taken exactly once and the file is read as we go.
+        for msg in it:
+            if msg.id in progress.done or msg.id in in_flight:
+                counts["skipped"] += 1
+                continue
+            in_flight.add(msg.id)
+            try:
+                result = await app.ainvoke({"email_from": msg.email_from, "email_body": msg.email_body})
+            except Exception as e:
+                # Not recorded, so the next run retries it.
+                counts["error"] += 1
+                print(f"[batch] {msg.id} failed:", repr(e), file=sys.stderr)
+            else:
+                outcome = outcome_of(result)
+                progress.record(msg.id, outcome, transaction_id=result.get("transaction_id"))
+                counts[outcome] += 1
+            finally:
+                in_flight.discard(msg.id)
+
+            n = processed()
+            if report_every and n % report_every == 0:
+                elapsed = time.perf_counter() - started
+                print(f"[batch] {n} messages, {n / elapsed:.1f} msg/s, {dict(counts)}", file=sys.stderr)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return counts, time.perf_counter() - started
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m agent_app.batch", description="Run the LOA graph over a mailbox file.")
+    p.add_argument("path", help="mbox or JSONL file")
+    p.add_argument("--format", choices=("auto", "mbox", "jsonl"), default="auto")
+    p.add_argument("--progress", help="progress file (default: <path>.progress.jsonl)")
+    p.add_argument("--concurrency", type=int, default=settings.batch_concurrency)
+    p.add_argument("--llm-concurrency", type=int, default=settings.batch_llm_concurrency)
+    p.add_argument("--mcp-concurrency", type=int, default=settings.batch_mcp_concurrency)
+    p.add_argument("--report-every", type=int, default=settings.batch_report_every)
+    p.add_argument("--quiet", action="store_true", help="hide per-node graph output")
+    return p.parse_args(argv)
+
+
+async def main(argv=None) -> dict:
+    args = _parse_args(argv)
+    configure_call_limits(llm=args.llm_concurrency, mcp=args.mcp_concurrency)
+    await get_mcp_tool_by_name()  # connect once, before the workers start
+
+    # No checkpointer: every email is a one-shot conversation, and the
+    # progress log (not graph state) is what a rerun resumes from.
+    app = build_graph(checkpointer=None)
+    progress = ProgressLog(args.progress or f"{args.path}.progress.jsonl")
+    quiet = open(os.devnull, "w") if args.quiet else None
+    try:
+        with contextlib.redirect_stdout(quiet) if quiet else contextlib.nullcontext():
+            counts, elapsed = await run_batch(
+                app, read_messages(args.path, args.format), progress, args.concurrency, args.report_every
+            )
+            EmailOutbox().flush()
+    finally:
+        progress.close()
+        await close_mcp_tools()
+        if quiet:
+            quiet.close()
+
+    processed = sum(n for outcome, n in counts.items() if outcome != "skipped")
+    summary = {
+        "processed": processed,
+        "seconds": round(elapsed, 3),
+        "messages_per_second": round(processed / elapsed, 2) if elapsed else 0.0,
+        "outcomes": dict(counts),
+        "llm_cache": await asyncio.to_thread(llm_cache.stats),
+    }
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
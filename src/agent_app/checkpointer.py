@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import aiosqlite
+import ormsgpack
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from shared.settings import settings
+from shared.sqlite_pool import apply_pragmas
+
+# 100-ns intervals between the UUID epoch (1582-10-15) and the Unix epoch.
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def _checkpoint_id_before(unix_seconds: float) -> str:
+    """
+    Smallest uuid6 string for the given time. LangGraph checkpoint ids are
+    uuid6, whose text form sorts by creation time, so `checkpoint_id < this`
+    selects checkpoints written before `unix_seconds`.
+    """
+    ts = int(unix_seconds * 10_000_000) + _UUID_EPOCH_OFFSET
+    return f"{ts >> 28:08x}-{(ts >> 12) & 0xFFFF:04x}-6{ts & 0xFFF:03x}-0000-000000000000"
+
+
+class CompactSerializer(SerializerProtocol):
+    """
+    Plain msgpack for checkpoints made only of primitives (the v2 AgentState),
+    without JsonPlus' per-object type envelopes. Anything else - dates,
+    tuples, pydantic models, LangGraph objects - is handed to JsonPlus, and
+    JsonPlus-written data (older checkpoints) still loads. With
+    compact_writes=False everything is written by JsonPlus, but compact
+    checkpoints from an earlier setting still load.
+    """
+
+    TYPE = "msgpack-compact"
+    # Make ormsgpack refuse (instead of silently stringify / listify) types
+    # it can't round-trip, so those go to the fallback.
+    _OPTIONS = (
+        ormsgpack.OPT_NON_STR_KEYS
+        | ormsgpack.OPT_PASSTHROUGH_DATETIME
+        | ormsgpack.OPT_PASSTHROUGH_DATACLASS
+        | ormsgpack.OPT_PASSTHROUGH_SUBCLASS
+        | ormsgpack.OPT_PASSTHROUGH_TUPLE
+        | ormsgpack.OPT_PASSTHROUGH_UUID
+        | ormsgpack.OPT_PASSTHROUGH_ENUM
+        | ormsgpack.OPT_PASSTHROUGH_BIG_INT
+    )
+
+    def __init__(self, compact_writes: bool = True):
+        self._fallback = JsonPlusSerializer()
+        self.compact_writes = compact_writes
+
+    def dumps_typed(self, obj):
+        if not self.compact_writes or obj is None or isinstance(obj, (bytes, bytearray)):
+            return self._fallback.dumps_typed(obj)
+        try:
+            return self.TYPE, ormsgpack.packb(obj, option=self._OPTIONS)
+        except (ormsgpack.MsgpackEncodeError, TypeError):
+            return self._fallback.dumps_typed(obj)
+
+    def loads_typed(self, data):
+        type_, data_ = data
+        if type_ == self.TYPE:
+            return ormsgpack.unpackb(data_, option=ormsgpack.OPT_NON_STR_KEYS)
+        return self._fallback.loads_typed(data)
+
+
+def make_serializer() -> SerializerProtocol:
+    return CompactSerializer(compact_writes=settings.checkpoint_serializer == "compact")
+
+
+class RetentionSqliteSaver(AsyncSqliteSaver):
+    """
+    AsyncSqliteSaver (WAL) with retention:
+    - keep at most settings.checkpoint_max_per_thread checkpoints per thread
+    - drop threads idle longer than settings.checkpoint_ttl_seconds
+    - reclaim freed pages with incremental vacuum and truncate the WAL
+    A background task runs prune + vacuum every checkpoint_maintenance_interval_seconds.
+    """
+
+    _maintenance: asyncio.Task | None = None
+
+    async def prune(self) -> dict:
+        await self.setup()
+        max_per_thread = settings.checkpoint_max_per_thread
+        ttl = settings.checkpoint_ttl_seconds
+        deleted = {"expired_threads": 0, "old_checkpoints": 0, "orphan_writes": 0}
+        async with self.lock:
+            if ttl > 0:
+                cutoff = _checkpoint_id_before(time.time() - ttl)
+                expired = (
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                    "HAVING MAX(checkpoint_id) < ?"
+                )
+                async with self.conn.execute(f"SELECT COUNT(*) FROM ({expired})", (cutoff,)) as cur:
+                    deleted["expired_threads"] = (await cur.fetchone())[0]
+                await self._run(f"DELETE FROM writes WHERE thread_id IN ({expired})", (cutoff,))
+                await self._run(f"DELETE FROM checkpoints WHERE thread_id IN ({expired})", (cutoff,))
+            if max_per_thread > 0:
+                deleted["old_checkpoints"] = await self._run(
+                    """
+                    DELETE FROM checkpoints WHERE rowid IN (
+                      SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (
+                          PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                        ) AS rn
+                        FROM checkpoints
+                      ) WHERE rn > ?
+                    )
+                    """,
+                    (max_per_thread,),
+                )
+                deleted["orphan_writes"] = await self._run(
+                    """
+                    DELETE FROM writes WHERE NOT EXISTS (
+                      SELECT 1 FROM checkpoints c
+                      WHERE c.thread_id = writes.thread_id
+                        AND c.checkpoint_ns = writes.checkpoint_ns
+                        AND c.checkpoint_id = writes.checkpoint_id
+                    )
+                    """
+                )
+            await self.conn.commit()
+        return deleted
+
+    async def _run(self, sql: str, params: tuple = ()) -> int:
+        """Execute, consume and close the cursor; returns its rowcount."""
+        async with self.conn.execute(sql, params) as cur:
+            await cur.fetchall()
+            return cur.rowcount
+
+    async def vacuum(self) -> None:
+        async with self.lock:
+            # Both PRAGMAs return rows: step them to the end so no statement is
+            # left open (an unfinished incremental_vacuum keeps the table locked
+            # and the checkpoint then fails with "database table is locked").
+            await self._run("PRAGMA incremental_vacuum")
+            await self.conn.commit()
+            await self._run("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(settings.checkpoint_maintenance_interval_seconds)
+            try:
+                deleted = await self.prune()
+                await self.vacuum()
+                print("[checkpointer] maintenance:", deleted)
+            except Exception as e:
+                print("[checkpointer] maintenance failed:", repr(e))
+
+    def start_maintenance(self) -> None:
+        if self._maintenance is None and settings.checkpoint_maintenance_interval_seconds > 0:
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def aclose(self) -> None:
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            self._maintenance = None
+        await self.conn.close()
+
+
+async def open_checkpointer() -> BaseCheckpointSaver:
+    """
+    Checkpointer selected by settings.checkpointer_backend ("sqlite" or "memory").
+    Call from the event loop that will run the graph; close with close_checkpointer().
+    """
+    serde = make_serializer()
+    if settings.checkpointer_backend == "memory":
+        return InMemorySaver(serde=serde)
+
+    conn = await aiosqlite.connect(settings.checkpoint_sqlite_path)
+    # Only takes effect on a fresh file (before any table exists); lets
+    # vacuum() hand pages freed by prune() back to the filesystem.
+    async with conn.execute("PRAGMA auto_vacuum=INCREMENTAL"):
+        pass
+    await apply_pragmas(conn)
+    saver = RetentionSqliteSaver(conn, serde=serde)
+    await saver.setup()
+    saver.start_maintenance()
+    return saver
+
+
+async def close_checkpointer(saver: BaseCheckpointSaver) -> None:
+    if isinstance(saver, RetentionSqliteSaver):
+        await saver.aclose()
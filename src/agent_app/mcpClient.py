@@ -1,37 +1,197 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_core.tools import ToolException
+from mcp.types import CallToolResult, Tool as MCPTool
+from pydantic import BaseModel
 from shared.settings import settings
+from shared.model_schema import (
+    EmployeeValidation, LeaveBalance, LeaveBalancePage, CreateLOAResponse, LOALookup,
+)
+from agent_app.mcp_pool import McpSessionPool
+
+_SERVER = "loa"
 
+# Pooled sessions belong to the event loop that opened them, so the tools
+# and the pool are rebuilt if we get called from a new loop.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_INIT_LOCK: asyncio.Lock | None = None
 _MCP_TOOLS: dict | None = None
+_POOL: McpSessionPool | None = None
+
+
+# Output model per tool. The server declares the same models as the tools'
+# output schemas; check_tool_contract() fails fast if a server's results
+# would no longer validate into them.
+TOOL_OUTPUT_MODELS: dict[str, type[BaseModel]] = {
+    "validate_employee": EmployeeValidation,
+    "get_leave_balance": LeaveBalance,
+    "get_leave_balances": LeaveBalancePage,
+    "create_loa": CreateLOAResponse,
+    "find_loa": LOALookup,
+}
+
 
+def _json_types(prop: dict, defs: dict) -> set[str]:
+    """JSON types a property schema allows; "any" if it doesn't say."""
+    if "$ref" in prop:
+        prop = defs.get(prop["$ref"].rsplit("/", 1)[-1], {"type": "object"})
+    if "anyOf" in prop:
+        return set().union(*(_json_types(p, defs) for p in prop["anyOf"]))
+    types = prop.get("type", "any")
+    return set(types) if isinstance(types, list) else {types}
 
-async def get_mcp_tool_by_name() -> dict:
+
+def contract_problems(output_schema: dict | None, model: type[BaseModel]) -> list[str]:
     """
-    Build MCP client + tools once per process and reuse.
-    DO NOT store tool objects in LangGraph state (will be dropped / not serializable).
+    Why a result matching the server's output schema might not validate into
+    `model`: a field the model requires that the server may leave out, or a
+    type the model doesn't accept. Extra or new optional server fields are fine.
     """
-    global _MCP_TOOLS
-    if _MCP_TOOLS is not None:
-        return _MCP_TOOLS
+    if not output_schema:
+        return ["no output schema"]
+    ours = model.model_json_schema()
+    theirs = output_schema.get("properties", {})
+    theirs_required = set(output_schema.get("required", []))
+    problems = [
+        f"{field}: required by the model, not by the server"
+        for field in ours.get("required", [])
+        if field not in theirs_required
+    ]
+    for field, prop in ours.get("properties", {}).items():
+        if field not in theirs:
+            continue
+        accepted = _json_types(prop, ours.get("$defs", {}))
+        sent = _json_types(theirs[field], output_schema.get("$defs", {}))
+        if "number" in accepted:
+            accepted.add("integer")
+        if "any" not in accepted and not sent <= accepted:
+            problems.append(f"{field}: server sends {sorted(sent)}, model accepts {sorted(accepted)}")
+    return problems
 
-    client = MultiServerMCPClient(
-        {
-            "loa": {
-                "url": settings.mcp_sse_url,
-                "transport": "sse",
-            }
-        }
-    )
-    tools = await client.get_tools()
-    tool_by_name = {t.name: t for t in tools}
 
-    # Ensure tools exist
-    expected = {"validate_employee", "get_leave_balance","create_loa"}
-    missing = expected - set(tool_by_name.keys())
+def check_tool_contract(tools: list[MCPTool]) -> None:
+    """Raise if a tool we call is missing or its results no longer fit our model."""
+    by_name = {t.name: t for t in tools}
+    missing = set(TOOL_OUTPUT_MODELS) - set(by_name)
     if missing:
         raise RuntimeError(
             f"Missing MCP tools: {sorted(missing)}. "
-            f"Available tools: {sorted(tool_by_name.keys())}"
+            f"Available tools: {sorted(by_name)}"
         )
+    drifted = {
+        name: problems
+        for name, model in TOOL_OUTPUT_MODELS.items()
+        if (problems := contract_problems(by_name[name].outputSchema, model))
+    }
+    if drifted:
+        raise RuntimeError(f"MCP tool output schemas incompatible with shared.model_schema: {drifted}")
+
+
+def decode_tool_result(name: str, result: CallToolResult) -> BaseModel:
+    if result.isError:
+        raise ToolException("\n".join(c.text for c in result.content if c.type == "text"))
+    model = TOOL_OUTPUT_MODELS[name]
+    if result.structuredContent is not None:
+        return model.model_validate(result.structuredContent)
+    # No structured content: parse the JSON text block straight into the model.
+    return model.model_validate_json(result.content[0].text)
+
+
+def mcp_connection() -> dict:
+    """Connection config for settings.mcp_transport (must match the server's)."""
+    transport = settings.mcp_transport
+    if transport == "streamable-http":
+        return {"url": settings.mcp_http_url, "transport": "streamable_http"}
+    if transport == "sse":
+        return {"url": settings.mcp_sse_url, "transport": "sse"}
+    raise ValueError(
+        f"Unsupported MCP_TRANSPORT {transport!r}: use 'sse', 'streamable-http' or 'in-process'"
+    )
+
+
+@asynccontextmanager
+async def _in_process_session():
+    """
+    Session to the `mcp` server object imported into this process, over
+    fastmcp's in-memory transport: no sockets, no HTTP, no JSON framing.
+    Entering it also runs the server's lifespan (Workday client, SQLite pool).
+    """
+    from fastmcp import Client
+    from mcp_server.server_sse import mcp
+
+    async with Client(mcp) as client:
+        yield client.session
+
+
+async def get_mcp_tool_by_name() -> dict[str, MCPTool]:
+    """
+    Connect the MCP session pool (see mcp_pool.py) once per event loop, check
+    the tool contract, and return the server's tool definitions by name.
+    Tools are called with call_tool().
+    """
+    global _LOOP, _INIT_LOCK, _MCP_TOOLS, _POOL
+    loop = asyncio.get_running_loop()
+    if _LOOP is not loop:
+        _LOOP, _INIT_LOCK, _MCP_TOOLS, _POOL = loop, asyncio.Lock(), None, None
+    if _MCP_TOOLS is not None:
+        return _MCP_TOOLS
+
+    # validate and balance run in parallel: only one of them builds the pool.
+    async with _INIT_LOCK:
+        if _MCP_TOOLS is not None:
+            return _MCP_TOOLS
+
+        if settings.mcp_transport == "in-process":
+            from mcp_server.server_sse import init_db
+
+            await init_db()  # what `python -m mcp_server.server_sse` does before serving
+            # Nothing to reconnect or spread over: one in-memory session is enough.
+            pool = McpSessionPool(_in_process_session, 1)
+        else:
+            client = MultiServerMCPClient({_SERVER: mcp_connection()})
+            pool = McpSessionPool(lambda: client.session(_SERVER), settings.mcp_session_pool_size)
+        try:
+            async with pool.session() as session:
+                listed = (await session.list_tools()).tools
+            check_tool_contract(listed)
+        except BaseException:
+            await pool.close()
+            raise
+        tool_by_name = {t.name: t for t in listed}
+
+        _MCP_TOOLS, _POOL = tool_by_name, pool
+        return tool_by_name
+
+
+async def call_tool(name: str, args: dict) -> BaseModel:
+    """
+    Call an MCP tool on the session pool and return its typed result
+    (TOOL_OUTPUT_MODELS[name]).
+    """
+    await get_mcp_tool_by_name()
+    return decode_tool_result(name, await _POOL.call_tool(name, args))
+
+
+def mcp_pool_stats() -> dict:
+    return _POOL.stats() if _POOL is not None else {}
+
+
+async def close_mcp_tools() -> None:
+    """Close the pooled sessions; call from the loop that used the tools."""
+    global _MCP_TOOLS, _POOL
+    pool, _MCP_TOOLS, _POOL = _POOL, None, None
+    if pool is not None:
+        await pool.close()
+
+
+async def _check() -> None:
+    await get_mcp_tool_by_name()
+    await close_mcp_tools()
+    print(f"MCP tool contract OK ({settings.mcp_transport}): {sorted(TOOL_OUTPUT_MODELS)}")
+
 
-    _MCP_TOOLS = tool_by_name
-    return tool_by_name
\ No newline at end of file
+if __name__ == "__main__":
+    # Contract check against the configured server: python -m agent_app.mcpClient
+    asyncio.run(_check())
@@ -0,0 +1,195 @@
+"""
+Small pool of long-lived MCP client sessions.
+
+Tools from MultiServerMCPClient.get_tools() open and initialize a new
+session for every call. call_tool() here (used by agent_app.mcpClient)
+instead runs each call on the least busy pooled session (MCP multiplexes
+concurrent requests over one session); the pool also works as a
+langchain-mcp-adapters tool interceptor. Sessions
+are connected lazily up to `size`. One that has been idle for a while, or
+whose last call failed, is pinged before reuse and reconnected if the ping
+fails. One whose transport has stopped reading (e.g. the server restarted)
+is reconnected right away, and each call has a read timeout: a call that
+times out or loses its connection is retried once on a fresh session.
+"""
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncContextManager, Callable
+
+import anyio
+import httpx
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, CallToolResult
+
+from shared.settings import settings
+
+# connects / pings / ping_failures / dropped / calls / retries / call_failures
+MCP_POOL_COUNTS: Counter = Counter()
+
+# Raised when writing to a session whose transport has already shut down.
+_SESSION_GONE = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+# McpError codes for "no response on this session" (the request may have run).
+_NO_RESPONSE = (CONNECTION_CLOSED, httpx.codes.REQUEST_TIMEOUT)
+
+
+def _transport_failed(e: BaseException) -> bool:
+    """The session, not the tool, failed: don't reuse it."""
+    if isinstance(e, (*_SESSION_GONE, TimeoutError, httpx.TransportError)):
+        return True
+    return isinstance(e, McpError) and e.error.code in _NO_RESPONSE
+
+
+def _reader_closed(session: ClientSession) -> bool:
+    # ClientSession closes its read stream once the transport's reader ends
+    # (the server went away), after which no response can arrive.
+    return getattr(getattr(session, "_read_stream", None), "_closed", False)
+
+# Opens one initialized session, e.g. lambda: client.session("loa")
+SessionFactory = Callable[[], AsyncContextManager[ClientSession]]
+
+
+class _Slot:
+    """
+    One pooled session. It is opened and closed by its own background task:
+    the transport's anyio task group must be exited by the task that entered
+    it, which is never the graph node that happens to trigger a reconnect.
+    """
+
+    def __init__(self, open_session: SessionFactory):
+        self._open_session = open_session
+        self._task: asyncio.Task | None = None
+        self._closing = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.session: ClientSession | None = None
+        self.in_flight = 0
+        self.last_ok = 0.0
+        self.suspect = False
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not _reader_closed(self.session)
+        )
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        try:
+            async with self._open_session() as session:
+                self.session = session
+                ready.set_result(None)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                MCP_POOL_COUNTS["dropped"] += 1
+                print("[mcp-pool] session dropped:", repr(e))
+        finally:
+            self.session = None
+
+    async def connect(self) -> None:
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            await asyncio.wait_for(ready, timeout=settings.mcp_session_connect_timeout_seconds)
+        except BaseException:
+            self._task.cancel()
+            raise
+        MCP_POOL_COUNTS["connects"] += 1
+        self.suspect = False
+        self.last_ok = time.monotonic()
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._closing.set()
+        done, _ = await asyncio.wait([task], timeout=5)
+        if not done:
+            task.cancel()
+
+
+class McpSessionPool:
+    def __init__(self, open_session: SessionFactory, size: int):
+        self._slots = [_Slot(open_session) for _ in range(max(1, size))]
+
+    async def _ensure(self, slot: _Slot) -> None:
+        async with slot.lock:
+            idle = time.monotonic() - slot.last_ok
+            if slot.alive and (slot.suspect or idle > settings.mcp_session_idle_check_seconds):
+                MCP_POOL_COUNTS["pings"] += 1
+                try:
+                    await asyncio.wait_for(slot.session.send_ping(), timeout=settings.mcp_ping_timeout_seconds)
+                    slot.suspect = False
+                    slot.last_ok = time.monotonic()
+                except Exception as e:
+                    MCP_POOL_COUNTS["ping_failures"] += 1
+                    print("[mcp-pool] ping failed, reconnecting:", repr(e))
+                    await slot.close()
+            if not slot.alive:
+                await slot.close()
+                await slot.connect()
+
+    @asynccontextmanager
+    async def session(self):
+        """Borrow the least busy session (connecting or health-checking it first)."""
+        # Idle live sessions first, then an unopened slot, then share the least busy.
+        slot = min(self._slots, key=lambda s: (s.in_flight, not s.alive))
+        slot.in_flight += 1
+        try:
+            await self._ensure(slot)
+            yield slot.session
+            slot.last_ok = time.monotonic()
+        except BaseException as e:
+            if _transport_failed(e):
+                await slot.close()  # reconnected by the next _ensure()
+            else:
+                # Tool-level errors come back as results, so this is another
+                # error or a cancellation: check the session before reuse.
+                slot.suspect = True
+            raise
+        finally:
+            slot.in_flight -= 1
+
+    async def call_tool(self, name: str, args: dict) -> CallToolResult:
+        MCP_POOL_COUNTS["calls"] += 1
+        read_timeout = timedelta(seconds=settings.mcp_read_timeout_seconds)
+        resent = False
+        for attempt in range(len(self._slots) + 1):
+            try:
+                async with self.session() as session:
+                    return await session.call_tool(name, args, read_timeout_seconds=read_timeout)
+            except Exception as e:
+                # A closed stream means the request never left: safe to retry,
+                # even for create_loa. After a timeout or a dropped connection
+                # it may have run, so that is retried once (create_loa derives
+                # an idempotency key, so a repeat doesn't create a second LOA).
+                never_sent = isinstance(e, _SESSION_GONE)
+                if attempt == len(self._slots) or not (never_sent or (_transport_failed(e) and not resent)):
+                    MCP_POOL_COUNTS["call_failures"] += 1
+                    raise
+                resent = resent or not never_sent
+                MCP_POOL_COUNTS["retries"] += 1
+
+    async def __call__(self, request: MCPToolCallRequest, handler) -> CallToolResult:
+        """ToolCallInterceptor: run the call on a pooled session instead of a new one."""
+        return await self.call_tool(request.name, request.args)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(slot.close() for slot in self._slots))
+
+    def stats(self) -> dict:
+        return {
+            **MCP_POOL_COUNTS,
+            "size": len(self._slots),
+            "open": sum(slot.alive for slot in self._slots),
+            "in_flight": sum(slot.in_flight for slot in self._slots),
+        }
@@ -1,70 +1,60 @@
 
 
-from typing import Any, Dict, TypedDict
-import json
+from typing import Annotated, Any, Dict, TypedDict
+import asyncio
+from langchain_core.tools import ToolException
+from langgraph.channels import UntrackedValue
 from shared.extraction_llm import extract_leave_request_llm
 from shared.intent_llm import classify_intent_llm
+from shared.intent_extraction_llm import classify_and_extract_llm
+from shared.intent_rules import classify_intent_rules, INTENT_PATH_COUNTS
+from shared.settings import settings
+from shared.call_limits import call_slot
 from shared.email_outbox import EmailOutbox
-from agent_app.mcpClient import get_mcp_tool_by_name
-from shared.friendly_message_llm import friendly_message_lln
-from shared.friendly_message_llm_success import friendly_message_lln_success
+from agent_app.mcpClient import call_tool
+from agent_app.prefetch import start_prefetch, take_prefetched, discard_prefetch
+from shared.friendly_message import friendly_message
+from shared.model_schema import LeaveRequest, EmployeeValidation, LeaveBalance
 
 
 # -----------------------------
 # LangGraph State
 # -----------------------------
+# v1: req was a pydantic LeaveRequest; tool payloads were checkpointed.
+# v2: req is JSON primitives; validation / balance / prefetch_id are per-run only.
+STATE_VERSION = 2
+
+
 class AgentState(TypedDict, total=False):
+    state_version: int
     email_from: str
     email_body: str
     intent: str                 # "balance" | "create_loa" | "unknown"
     missing: list[str]          # missing fields like ["start_date","end_date"]
     last_answer: str            # what we told user last
-    req: Any  # LeaveRequest (pydantic)
-    validation: Dict[str, Any]
-    balance: Dict[str, Any]
+    req: Dict[str, Any] | None  # LeaveRequest.model_dump(mode="json"); use load_req()
+    # Transient typed tool results (None if the call failed): visible to later
+    # nodes in the same run, never checkpointed.
+    validation: Annotated[EmployeeValidation | None, UntrackedValue(object)]
+    balance: Annotated[LeaveBalance | None, UntrackedValue(object)]
+    prefetch_id: Annotated[str | None, UntrackedValue(str)]  # see prefetch.py
+    duplicate: Annotated[bool, UntrackedValue(bool)]  # this turn repeats an LOA already created
+    failure_reason: Annotated[str | None, UntrackedValue(str)]  # create_loa's error message
     transaction_id: str
     status: str
     ok: bool
     message: str
 
-def normalize_tool_output(raw: Any) -> Dict[str, Any]:
-    """
-    Normalize MCP tool output to a dict.
-
-    Handles:
-    - dict already (normal)
-    - list[dict]
-    - langchain-style content blocks: {"type":"text","text":"{...json...}"}
-    - wrappers: {"content":[{...}]}
-    """
-    if raw is None:
-        return {}
-    if isinstance(raw, list):
-        if not raw:
-            return {}
-        return normalize_tool_output(raw[0])
-
-    if isinstance(raw, dict) and "content" in raw and isinstance(raw["content"], list) and raw["content"]:
-        return normalize_tool_output(raw["content"][0])
-
-    if isinstance(raw, dict) and raw.get("type") == "text" and isinstance(raw.get("text"), str):
-        text = raw["text"].strip()
-        try:
-            obj = json.loads(text)
-            if isinstance(obj, dict):
-                return obj
-            return {"value": obj}
-        except json.JSONDecodeError:
-            return {"text": text}
-    if isinstance(raw, dict):
-        for key in ("result", "data", "output"):
-            if key in raw:
-                return normalize_tool_output(raw[key])
-        return raw
 
-    return {"value": raw}
+def dump_req(req: LeaveRequest | None) -> Dict[str, Any] | None:
+    return req.model_dump(mode="json") if req is not None else None
 
 
+def load_req(state: AgentState) -> LeaveRequest | None:
+    req = state.get("req")
+    if req is None or isinstance(req, LeaveRequest):  # LeaveRequest: v1 checkpoint
+        return req
+    return LeaveRequest.model_validate(req)
 
 # -----------------------------
 # Graph Nodes
@@ -78,68 +68,106 @@ async def node_extract(state: AgentState) -> AgentState:
         email_from=state["email_from"],
         email_body=state["email_body"],
     )
-    return {"req": req}
+    return {"req": dump_req(req)}
 
 
-async def node_validate(state: AgentState) -> AgentState:
-    tool_by_name = await get_mcp_tool_by_name()
+async def node_check_duplicate(state: AgentState) -> AgentState:
+    """
+    Resent email / resubmitted form: if an LOA already exists for this
+    employee and these dates, answer with it and skip validate / balance /
+    create / email. If the lookup fails we carry on; create_loa is idempotent.
+    """
+    req = load_req(state)
+    if not req:
+        return {}
+    found = await _call_tool(
+        "find_loa",
+        {
+            "employee_email": str(req.employee_email),
+            "start_date": req.start_date.isoformat(),
+            "end_date": req.end_date.isoformat(),
+        },
+    )
+    if found is None or found.transaction_id is None:
+        return {}
 
-    req = state.get("req")  # may be missing for balance intent
-    employee_email = (
+    discard_prefetch(state.get("prefetch_id"))
+    msg = (
+        f"Your leave request for {req.start_date} to {req.end_date} was already submitted "
+        f"(transaction {found.transaction_id}, status {found.status}). No new request was created."
+    )
+    return {
+        "duplicate": True,
+        "transaction_id": found.transaction_id,
+        "status": found.status,
+        "ok": True,
+        "message": msg,
+    }
+
+
+def _employee_email(state: AgentState) -> str:
+    req = load_req(state)  # may be missing for balance intent
+    return (
         str(req.employee_email) if req and getattr(req, "employee_email", None)
         else str(state.get("email_from"))
     )
 
-    raw = await tool_by_name["validate_employee"].ainvoke(
-        {"employee_email": employee_email}
-    )
-    validation = normalize_tool_output(raw)
 
-    print("[graph] validate_employee raw:", type(raw), raw)
-    print("[graph] validate_employee normalized:", validation)
+async def _call_tool(name: str, args: Dict[str, Any]) -> Any:
+    """
+    Call one MCP tool with its own timeout; returns its typed result, or None
+    on failure. validate and balance run as parallel branches, so a failure
+    here is reported in that branch's result instead of failing (or holding
+    up) the other one.
+    """
+    try:
+        async with call_slot("mcp"):  # waiting for a slot doesn't count towards the timeout
+            out = await asyncio.wait_for(call_tool(name, args), timeout=settings.mcp_tool_timeout_seconds)
+    except Exception as e:
+        print(f"[graph] {name} failed:", repr(e))
+        return None
 
-    return {"validation": validation}
+    print(f"[graph] {name}:", out)
+    return out
 
 
+async def _prefetched_or_call(state: AgentState, name: str) -> Any:
+    employee_email = _employee_email(state)
+    out = await take_prefetched(state.get("prefetch_id"), name, employee_email)
+    if out is None:
+        out = await _call_tool(name, {"employee_email": employee_email})
+    return out
 
-async def node_balance(state: AgentState) -> AgentState:
-    tool_by_name = await get_mcp_tool_by_name()
 
-    req = state.get("req")  # may be missing for balance intent
-    employee_email = (
-        str(req.employee_email) if req and getattr(req, "employee_email", None)
-        else str(state.get("email_from"))
-    )
-
-    raw = await tool_by_name["get_leave_balance"].ainvoke(
-        {"employee_email": employee_email}
-    )
-    balance = normalize_tool_output(raw)
+async def node_validate(state: AgentState) -> AgentState:
+    return {"validation": await _prefetched_or_call(state, "validate_employee")}
 
-    print("[graph] get_leave_balance raw:", type(raw), raw)
-    print("[graph] get_leave_balance normalized:", balance)
 
-    return {"balance": balance}
+async def node_balance(state: AgentState) -> AgentState:
+    return {"balance": await _prefetched_or_call(state, "get_leave_balance")}
 
 
+async def node_join(state: AgentState) -> AgentState:
+    """Fan-in point: runs once both validate and balance have finished."""
+    return {}
 
 
 async def node_create_loa(state: AgentState) -> AgentState:
-    req = state.get("req")
-    validation = state.get("validate_employee") or {}
-    balance = state.get("get_leave_balance") or {}
+    req = load_req(state)
+    validation = state.get("validation")
     if not req:
-        return {"ok": False, "message": "Missing leave details. Please provide start and end date."}
+        return {"ok": False, "message": "Missing leave details. Please provide start and end date.", "loa_created": False}
 
-    tool_by_name = await get_mcp_tool_by_name()
-    if not validation.get("ok_to_create_loa", False):
-        email = validation.get("employee_email") or state.get("employee_email")
-        if validation.get("currently_on_leave"):
+    if validation is None or not validation.ok_to_create_loa:
+        email = validation.employee_email if validation else state.get("email_from")
+        if validation is None:
+            msg = f"I couldn’t check whether {email} can create an LOA right now. Please try again later."
+        elif validation.currently_on_leave:
             msg = (
                 f"{email} appears to be currently on leave, so I can’t create a new LOA request yet. "
                 f"Please check existing leave dates in Workday or provide updated dates."
             )
-        elif not validation.get("active"):
+        elif not validation.active:
             msg = f"{email} is not an active employee, so I can’t create an LOA request."
         else:
             msg = f"{email} is not eligible to create LOA right now."
@@ -149,24 +177,47 @@ async def node_create_loa(state: AgentState) -> AgentState:
             "loa_created": False,
         }
 
-    raw = await tool_by_name["create_loa"].ainvoke(
-        {
-            "employee_email": str(req.employee_email),
-            "start_date": req.start_date.isoformat(),
-            "end_date": req.end_date.isoformat(),
-            "employee_name": req.employee_name,
-            "reason": req.reason,
-        }
-    )
-    data = normalize_tool_output(raw)
-    return {"transaction_id": data["transaction_id"], "status": data["status"]}
+    try:
+        async with call_slot("mcp"):
+            created = await asyncio.wait_for(
+                call_tool(
+                    "create_loa",
+                    {
+                        "employee_email": str(req.employee_email),
+                        "start_date": req.start_date.isoformat(),
+                        "end_date": req.end_date.isoformat(),
+                        "employee_name": req.employee_name,
+                        "reason": req.reason,
+                    },
+                ),
+                timeout=settings.mcp_tool_timeout_seconds,
+            )
+    except ToolException as e:
+        # Rejected by the server, e.g. not enough leave balance left for these dates.
+        return {"final_message": str(e), "failure_reason": str(e), "loa_created": False}
+    except Exception as e:
+        # Timeout or MCP / transport error: the request may or may not have
+        # gone through. Sending it again is safe (the server derives an
+        # idempotency key from the employee and dates).
+        print("[graph] create_loa failed:", repr(e))
+        if isinstance(e, TimeoutError):
+            reason = "The leave system didn't respond in time. Please send the request again."
+        else:
+            reason = "The leave system couldn't be reached. Please send the request again."
+        return {"final_message": reason, "failure_reason": reason, "loa_created": False}
+    out = {"transaction_id": created.transaction_id, "status": created.status, "loa_created": True}
+    if created.balance_days is not None:
+        # The balance fetched before create_loa doesn't include this request's debit.
+        out["balance"] = LeaveBalance(employee_email=str(req.employee_email), balance_days=created.balance_days)
+    return out
 
 
 
 async def node_email_success(state: AgentState) -> AgentState:
-    req = state["req"]
-    balance = state.get("balance", {})
-    validation = state.get("validation", {})    
+    discard_prefetch(state.get("prefetch_id"))
+    req = load_req(state)
+    balance = state.get("balance")
+    validation = state.get("validation")
     outbox = EmailOutbox()
 
 
@@ -186,16 +237,13 @@ async def node_email_success(state: AgentState) -> AgentState:
         "start_date": str(start_date) if start_date else "N/A",
         "end_date": str(end_date) if end_date else "N/A",
         "reason": reason or "N/A",
-        "active": validation.get("active"),
-        "currently_on_leave": validation.get("currently_on_leave"),
-        "balance_days": balance.get("balance_days", "N/A"),
+        "active": validation.active if validation else None,
+        "currently_on_leave": validation.currently_on_leave if validation else None,
+        "balance_days": balance.balance_days if balance else "N/A",
     }
 
-    # ✅ LLM creates a user-friendly message
-    # llm_msg = await llm.ainvoke(FAILURE_PROMPT.format_messages(**prompt_vars))
-    # friendly_text = llm_msg.content.strip()
-
-    friendly_text=await friendly_message_lln_success(prompt_vars)
+    # ✅ Template for known outcomes, LLM (cached per outcome) otherwise
+    friendly_text = await friendly_message("success", prompt_vars)
 
     
     outbox.send(
@@ -243,9 +291,10 @@ async def node_email_success(state: AgentState) -> AgentState:
 #     return {"ok": False, "message": "Validation failed; email sent to employee."}
 
 async def node_email_failure(state: AgentState) -> AgentState:
-    req = state.get("req")
-    validation = state.get("validation", {})          # or validate_employee
-    balance = state.get("get_leave_balance", {})      # if you have it
+    discard_prefetch(state.get("prefetch_id"))  # e.g. "unknown" intent never needed it
+    req = load_req(state)
+    validation = state.get("validation")  # None if not fetched / the call failed
+    balance = state.get("balance")
     outbox = EmailOutbox()
 
     employee_email = (
@@ -275,16 +324,14 @@ async def node_email_failure(state: AgentState) -> AgentState:
         "start_date": str(start_date) if start_date else "N/A",
         "end_date": str(end_date) if end_date else "N/A",
         "reason": reason or "N/A",
-        "active": validation.get("active"),
-        "currently_on_leave": validation.get("currently_on_leave"),
-        "balance_days": balance.get("balance_days", "N/A"),
+        "active": validation.active if validation else None,
+        "currently_on_leave": validation.currently_on_leave if validation else None,
+        "balance_days": balance.balance_days if balance else "N/A",
+        "failure_reason": state.get("failure_reason") or "N/A",
     }
 
-    # ✅ LLM creates a user-friendly message
-    # llm_msg = await llm.ainvoke(FAILURE_PROMPT.format_messages(**prompt_vars))
-    # friendly_text = llm_msg.content.strip()
-
-    friendly_text=await friendly_message_lln(prompt_vars)
+    # ✅ Template for known outcomes, LLM (cached per outcome) otherwise
+    friendly_text = await friendly_message("failure", prompt_vars)
 
     # Send email with same friendly text
     outbox.send(
@@ -303,31 +350,58 @@ async def node_route_intent(state: AgentState) -> AgentState:
     print("TEST#######",state)
     text = state.get("email_body", "")
     email_from = state.get("email_from", "")
+
+    out = classify_intent_rules(text)
+    fast = out.confidence >= settings.intent_fast_path_threshold
+
+    # Speculatively start validate/balance so they overlap the LLM calls
+    # (intent and/or extraction); skipped when the rules already say "unknown".
+    prefetch_id = None
+    if settings.speculative_prefetch and email_from and not (fast and out.intent == "unknown"):
+        prefetch_id = start_prefetch(email_from, _call_tool)
+
+    # "req" is reset every turn so a request from an earlier turn in this
+    # thread is never mistaken for an already-extracted one.
+    turn = {"state_version": STATE_VERSION, "req": None, "prefetch_id": prefetch_id}
+
+    if fast:
+        INTENT_PATH_COUNTS[f"fast_path:{out.intent}"] += 1
+        print("[intent-rules]", out.intent, out.confidence, out.reason)
+        return {**turn, "intent": out.intent}
+
+    INTENT_PATH_COUNTS["llm"] += 1
+    if settings.intent_extraction_mode == "combined":
+        out = await classify_and_extract_llm(email_from=email_from, text=text)
+        print("[intent+extract-llm]", out.intent, out.confidence, out.reason, out.leave_request)
+        return {**turn, "intent": out.intent, "req": dump_req(out.leave_request)}
+
     out = await classify_intent_llm(email_from=email_from, text=text)
     # Optional debug
     print("[intent-llm]", out.intent, out.confidence, out.reason)
-    return {"intent": out.intent}
+    return {**turn, "intent": out.intent}
 
 
 
 
 def route_after_validate(state: AgentState) -> str:
-    validation = state.get("validation", {})
-    return "balance" if validation.get("ok_to_create_loa") else "email_failure"
+    validation = state.get("validation")
+    return "balance" if validation and validation.ok_to_create_loa else "email_failure"
 
 
 def route_after_intent(state: AgentState) -> str:
     intent = state.get("intent", "unknown")
     if intent == "balance":
-        return "validate"
+        return ["validate", "balance"]
     if intent == "create_loa":
-        return "extract"
+        # combined intent+extraction mode may already have produced the request
+        return "check_duplicate" if state.get("req") else "extract"
     return "email_failure"   # or a new "ask_clarify" node
 
 
 async def node_reply_balance(state: AgentState) -> AgentState:
-    bal = state.get("balance", {})
-    days = bal.get("balance_days")
+    discard_prefetch(state.get("prefetch_id"))
+    bal = state.get("balance")
+    days = bal.balance_days if bal else None
     msg = f"Your current leave balance is {days} day(s)." if days is not None else "I couldn’t fetch your balance."
     return {"ok": True, "message": msg}
 
@@ -336,8 +410,8 @@ def route_after_balance(s: dict) -> str:
     if s.get("intent") == "balance":
         return "reply_balance"
 
-    ve = s.get("validate_employee") or {}
-    if ve.get("ok_to_create_loa") is True:
+    ve = s.get("validation")
+    if ve is not None and ve.ok_to_create_loa:
         return "create_loa"
 
     return "email_failure"
@@ -345,5 +419,9 @@ def route_after_balance(s: dict) -> str:
 
 
 
+def route_after_check_duplicate(s: dict):
+    return "done" if s.get("duplicate") else ["validate", "balance"]
+
+
 def route_after_create_loa(s: dict) -> str:
     return "email_success" if s.get("loa_created") is True else "email_failure"
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+from shared.settings import settings
+
+# Tools we speculatively start when a turn begins (both keyed by employee email).
+PREFETCH_TOOLS = ("validate_employee", "get_leave_balance")
+
+# started / used / wasted / mismatch (prefetched for a different employee)
+PREFETCH_COUNTS: Counter = Counter()
+
+
+@dataclass
+class Prefetch:
+    employee_email: str
+    tasks: Dict[str, asyncio.Task] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+# prefetch_id -> Prefetch. Tasks can't go into LangGraph state (not
+# serializable), so the state only carries the id for this invocation.
+_PREFETCHES: Dict[str, Prefetch] = {}
+
+
+def _cancel(prefetch: Prefetch) -> None:
+    for task in prefetch.tasks.values():
+        task.cancel()
+    PREFETCH_COUNTS["wasted"] += len(prefetch.tasks)
+    prefetch.tasks.clear()
+
+
+def _sweep_stale() -> None:
+    # Runs that errored out never reach a terminal node; don't leak their tasks.
+    cutoff = time.monotonic() - settings.prefetch_max_age_seconds
+    for prefetch_id in [k for k, p in _PREFETCHES.items() if p.created_at < cutoff]:
+        _cancel(_PREFETCHES.pop(prefetch_id))
+
+
+def start_prefetch(
+    employee_email: str,
+    call_tool: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+) -> str:
+    """Start the employee-keyed MCP calls in the background; returns the prefetch id."""
+    _sweep_stale()
+    prefetch = Prefetch(employee_email=employee_email)
+    for name in PREFETCH_TOOLS:
+        prefetch.tasks[name] = asyncio.create_task(call_tool(name, {"employee_email": employee_email}))
+    PREFETCH_COUNTS["started"] += len(prefetch.tasks)
+    prefetch_id = uuid.uuid4().hex
+    _PREFETCHES[prefetch_id] = prefetch
+    return prefetch_id
+
+
+async def take_prefetched(prefetch_id: str | None, name: str, employee_email: str) -> Any:
+    """
+    Typed result of a prefetched tool call, or None if there is none usable
+    (mode off, already taken, started for a different employee, or it failed,
+    in which case the caller simply makes the call itself).
+    """
+    prefetch = _PREFETCHES.get(prefetch_id) if prefetch_id else None
+    if prefetch is None:
+        return None
+    task = prefetch.tasks.pop(name, None)
+    if not prefetch.tasks:
+        _PREFETCHES.pop(prefetch_id, None)
+    if task is None:
+        return None
+    if prefetch.employee_email != employee_email:
+        task.cancel()
+        PREFETCH_COUNTS["mismatch"] += 1
+        return None
+    PREFETCH_COUNTS["used"] += 1
+    return await task
+
+
+def discard_prefetch(prefetch_id: str | None) -> None:
+    """Cancel whatever this invocation prefetched but didn't use."""
+    prefetch = _PREFETCHES.pop(prefetch_id, None) if prefetch_id else None
+    if prefetch is not None:
+        _cancel(prefetch)
+
+
+def prefetch_stats() -> dict:
+    started = PREFETCH_COUNTS["started"]
+    return {
+        **PREFETCH_COUNTS,
+        "useful_rate": round(PREFETCH_COUNTS["used"] / started, 4) if started else 0.0,
+    }
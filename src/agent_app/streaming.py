@@ -0,0 +1,59 @@
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from shared.friendly_message import STREAM_FILL_KEY, STREAM_TAG, PlaceholderFiller
+
+# Graph nodes worth showing as progress, with a user-facing label.
+NODE_LABELS = {
+    "route_intent": "Understanding your message",
+    "extract": "Reading leave details",
+    "check_duplicate": "Checking for an existing request",
+    "validate": "Checking employee status",
+    "balance": "Looking up leave balance",
+    "create_loa": "Creating leave request",
+    "email_success": "Writing confirmation",
+    "email_failure": "Writing reply",
+    "reply_balance": "Writing reply",
+}
+
+
+async def stream_turn(app, inputs: Dict[str, Any], config: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run one graph turn with astream_events and yield:
+      ("node", name)   when a graph node starts
+      ("token", text)  for each token of user-facing LLM output (STREAM_TAG),
+                       with placeholders already filled in
+      ("reset", None)  the tokens so far are to be discarded: that LLM output
+                       was unusable and a new one follows
+      ("final", state) once, with the final graph state
+    """
+    final = None
+    fillers: Dict[str, PlaceholderFiller] = {}  # per LLM run
+    async for event in app.astream_events(inputs, config=config, version="v2"):
+        kind = event["event"]
+        node = event["metadata"].get("langgraph_node")
+        if kind == "on_chain_start" and node and event["name"] == node:
+            yield "node", node
+        elif kind == "on_chat_model_stream" and STREAM_TAG in event.get("tags", []):
+            filler = fillers.get(event["run_id"])
+            if filler is None:
+                filler = fillers[event["run_id"]] = PlaceholderFiller(event["metadata"].get(STREAM_FILL_KEY))
+            was_mangled = filler.mangled
+            text = filler.feed(event["data"]["chunk"].content or "")
+            if text:
+                yield "token", text
+            if filler.mangled and not was_mangled:
+                yield "reset", None
+        elif kind == "on_chat_model_end" and event["run_id"] in fillers:
+            filler = fillers.pop(event["run_id"])
+            was_mangled = filler.mangled
+            text = filler.flush()
+            if text:
+                yield "token", text
+            if filler.mangled and not was_mangled:
+                yield "reset", None
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            final = event["data"].get("output")
+
+    if not isinstance(final, dict):
+        final = (await app.aget_state(config)).values
+    yield "final", final
@@ -0,0 +1,140 @@
+"""
+create_loa idempotency records.
+
+One loa_request row per idempotency key (shared.idempotency): claimed before
+the leave balance is debited, completed with the Workday transaction id once
+Workday accepts the request. A repeat of a completed request gets the stored
+transaction back without touching the ledger or Workday; a repeat that
+arrives while the first one is still running is refused.
+
+A claim is a lease: if it is still unfinished after
+settings.loa_claim_lease_seconds (the server died between debit and
+Workday, say), the next request for the key takes it over and the old
+claim's debit is reversed. Should the old request finish after all, Workday
+honours the same key, so both end up with one transaction and one debit.
+"""
+import time
+from datetime import date
+
+import aiosqlite
+
+from mcp_server import ledger
+from shared.model_schema import CreateLOAResponse
+from shared.settings import settings
+
+
+class RequestInProgress(Exception):
+    pass
+
+
+class IdempotencyKeyMismatch(Exception):
+    pass
+
+
+async def init_idempotency(db: aiosqlite.Connection) -> None:
+    """Create / migrate the loa_request table; call inside init_db's transaction."""
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS loa_request (
+          idempotency_key TEXT PRIMARY KEY,
+          employee_email TEXT NOT NULL,
+          start_date TEXT NOT NULL,
+          end_date TEXT NOT NULL,
+          transaction_id TEXT,             -- NULL while the request is in flight
+          status TEXT,
+          claimed_at REAL NOT NULL DEFAULT 0,  -- unix time; identifies the current claim
+          created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+        """
+    )
+    async with db.execute("PRAGMA table_info(loa_request)") as cur:
+        columns = {row[1] async for row in cur}
+    if "claimed_at" not in columns:
+        await db.execute("ALTER TABLE loa_request ADD COLUMN claimed_at REAL NOT NULL DEFAULT 0")
+
+
+async def lookup(db: aiosqlite.Connection, key: str) -> CreateLOAResponse | None:
+    """The completed request for this key, if any."""
+    async with db.execute(
+        "SELECT transaction_id, status FROM loa_request "
+        "WHERE idempotency_key = ? AND transaction_id IS NOT NULL",
+        (key,),
+    ) as cur:
+        row = await cur.fetchone()
+    return CreateLOAResponse(transaction_id=row[0], status=row[1]) if row else None
+
+
+async def claim(
+    db: aiosqlite.Connection, key: str, employee_email: str, start_date: date, end_date: date
+) -> tuple[CreateLOAResponse | None, float]:
+    """
+    Claim the key for a new request: returns (None, claimed_at), where
+    claimed_at identifies this claim for release(). For a key that already
+    has a result, returns (that result, 0).
+    Raises RequestInProgress if an earlier claim is unfinished and its lease
+    hasn't run out, and IdempotencyKeyMismatch if the key was used for a
+    different employee or dates.
+    """
+    now = time.time()
+    cur = await db.execute(
+        "INSERT OR IGNORE INTO loa_request(idempotency_key, employee_email, start_date, end_date, claimed_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (key, employee_email, start_date.isoformat(), end_date.isoformat(), now),
+    )
+    await db.commit()
+    if cur.rowcount == 1:
+        return None, now
+
+    async with db.execute(
+        "SELECT employee_email, start_date, end_date, transaction_id, status, claimed_at "
+        "FROM loa_request WHERE idempotency_key = ?",
+        (key,),
+    ) as cur:
+        row = await cur.fetchone()
+    if row is None:  # released in the meantime
+        return await claim(db, key, employee_email, start_date, end_date)
+    seen_email, seen_start, seen_end, transaction_id, status, claimed_at = row
+    if (seen_email.lower(), seen_start, seen_end) != (
+        employee_email.lower(), start_date.isoformat(), end_date.isoformat()
+    ):
+        raise IdempotencyKeyMismatch(
+            f"Idempotency key {key} was already used for {seen_email} from {seen_start} to {seen_end}."
+        )
+    if transaction_id is not None:
+        return CreateLOAResponse(transaction_id=transaction_id, status=status), 0.0
+
+    if claimed_at < now - settings.loa_claim_lease_seconds:
+        # Stale claim: take it over (only one taker wins the compare-and-set)
+        # and give back whatever its owner had debited, in the same transaction.
+        cur = await db.execute(
+            "UPDATE loa_request SET claimed_at = ? "
+            "WHERE idempotency_key = ? AND transaction_id IS NULL AND claimed_at = ?",
+            (now, key, claimed_at),
+        )
+        if cur.rowcount == 1:
+            await ledger.reverse_open_debits(db, key)  # commits
+            return None, now
+        await db.rollback()
+        return await claim(db, key, employee_email, start_date, end_date)
+
+    raise RequestInProgress(
+        f"A leave request for {employee_email} from {start_date} to {end_date} "
+        "is already being processed."
+    )
+
+
+async def complete(db: aiosqlite.Connection, key: str, resp: CreateLOAResponse) -> None:
+    await db.execute(
+        "UPDATE loa_request SET transaction_id = ?, status = ? WHERE idempotency_key = ?",
+        (resp.transaction_id, resp.status, key),
+    )
+    await db.commit()
+
+
+async def release(db: aiosqlite.Connection, key: str, claimed_at: float) -> None:
+    """Drop our unfinished claim (the request failed) so it can be retried."""
+    await db.execute(
+        "DELETE FROM loa_request WHERE idempotency_key = ? AND transaction_id IS NULL AND claimed_at = ?",
+        (key, claimed_at),
+    )
+    await db.commit()
@@ -0,0 +1,188 @@
+"""
+Leave balance ledger.
+
+leave_ledger is append-only: every opening balance, debit and reversal is a
+row with its signed delta and the resulting balance (only transaction_id is
+filled in later, once Workday has accepted the request).
+leave_balance.balance_days is the materialized current balance that
+get_leave_balance reads, and leave_balance.version is bumped on every change.
+
+Debits use optimistic concurrency: read balance + version without a lock,
+fail fast if the balance is too low, then UPDATE ... WHERE version = ?. If
+another request changed the row in between, the UPDATE matches nothing and
+the debit re-reads and tries again. The write lock is only held for that
+UPDATE and the ledger INSERT, never across the Workday call.
+"""
+from collections import Counter
+from datetime import date
+
+import aiosqlite
+
+from shared.settings import settings
+
+# debits / rejected (insufficient balance) / conflicts (version retries) / reversals
+LEDGER_COUNTS: Counter = Counter()
+
+
+class InsufficientBalance(Exception):
+    def __init__(self, employee_email: str, requested: int, available: int):
+        super().__init__(
+            f"Insufficient leave balance for {employee_email}: "
+            f"requested {requested} day(s), available {available}."
+        )
+        self.requested = requested
+        self.available = available
+
+
+def requested_days(start_date: date, end_date: date) -> int:
+    """Calendar days, both ends included (same rule as the friendly messages)."""
+    return (end_date - start_date).days + 1
+
+
+async def init_ledger(db: aiosqlite.Connection) -> None:
+    """Create / migrate the ledger tables; call inside init_db's transaction."""
+    async with db.execute("PRAGMA table_info(leave_balance)") as cur:
+        columns = {row[1] async for row in cur}
+    if "version" not in columns:  # databases from before the ledger
+        await db.execute("ALTER TABLE leave_balance ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    await db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leave_ledger (
+          id INTEGER PRIMARY KEY,
+          employee_email TEXT NOT NULL,
+          entry_date TEXT NOT NULL DEFAULT (date('now')),
+          kind TEXT NOT NULL,              -- opening | debit | reversal
+          delta_days INTEGER NOT NULL,
+          balance_after INTEGER NOT NULL,
+          start_date TEXT,
+          end_date TEXT,
+          transaction_id TEXT,
+          idempotency_key TEXT,            -- create_loa request a debit belongs to
+          ref_id INTEGER REFERENCES leave_ledger(id),
+          created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+        )
+        """
+    )
+    async with db.execute("PRAGMA table_info(leave_ledger)") as cur:
+        columns = {row[1] async for row in cur}
+    if "idempotency_key" not in columns:
+        await db.execute("ALTER TABLE leave_ledger ADD COLUMN idempotency_key TEXT")
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS ix_leave_ledger_employee_date "
+        "ON leave_ledger(employee_email, entry_date)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS ix_leave_ledger_idempotency_key ON leave_ledger(idempotency_key)"
+    )
+    # Every balance row starts with an opening entry, so the ledger always sums to it.
+    await db.execute(
+        """
+        INSERT INTO leave_ledger(employee_email, kind, delta_days, balance_after)
+        SELECT b.employee_email, 'opening', b.balance_days, b.balance_days
+        FROM leave_balance b
+        WHERE NOT EXISTS (SELECT 1 FROM leave_ledger l WHERE l.employee_email = b.employee_email)
+        """
+    )
+
+
+async def debit(
+    db: aiosqlite.Connection,
+    employee_email: str,
+    start_date: date,
+    end_date: date,
+    idempotency_key: str | None = None,
+) -> tuple[int, int]:
+    """
+    Take the requested days off the balance; returns (ledger entry id, balance after).
+    Raises InsufficientBalance without writing anything if the balance is too low.
+    """
+    days = requested_days(start_date, end_date)
+    for _ in range(max(1, settings.ledger_max_retries)):
+        async with db.execute(
+            "SELECT balance_days, version FROM leave_balance WHERE employee_email = ?",
+            (employee_email,),
+        ) as cur:
+            row = await cur.fetchone()
+        balance, version = row if row else (0, None)
+        if balance < days:
+            LEDGER_COUNTS["rejected"] += 1
+            raise InsufficientBalance(employee_email, days, balance)
+
+        try:
+            cur = await db.execute(
+                "UPDATE leave_balance SET balance_days = ?, version = version + 1 "
+                "WHERE employee_email = ? AND version = ?",
+                (balance - days, employee_email, version),
+            )
+            if cur.rowcount == 1:
+                cur = await db.execute(
+                    "INSERT INTO leave_ledger(employee_email, kind, delta_days, balance_after, start_date, end_date, "
+                    "idempotency_key) VALUES (?, 'debit', ?, ?, ?, ?, ?)",
+                    (employee_email, -days, balance - days, start_date.isoformat(), end_date.isoformat(),
+                     idempotency_key),
+                )
+                await db.commit()
+                LEDGER_COUNTS["debits"] += 1
+                return cur.lastrowid, balance - days
+        finally:
+            # Pooled connection: never hand it back mid-transaction.
+            if db.in_transaction:
+                await db.rollback()
+        LEDGER_COUNTS["conflicts"] += 1
+    raise RuntimeError(f"Could not debit leave for {employee_email}: too many concurrent updates")
+
+
+async def reverse(db: aiosqlite.Connection, debit_id: int) -> None:
+    """
+    Give a debit back (e.g. Workday rejected the request) with a reversal
+    entry. A debit that was already reversed is left alone.
+    """
+    async with db.execute(
+        "SELECT 1 FROM leave_ledger WHERE kind = 'reversal' AND ref_id = ?", (debit_id,)
+    ) as cur:
+        if await cur.fetchone() is not None:
+            await db.commit()  # commits like a reversal would (see reverse_open_debits)
+            return
+    async with db.execute(
+        "SELECT employee_email, delta_days, start_date, end_date FROM leave_ledger WHERE id = ?",
+        (debit_id,),
+    ) as cur:
+        employee_email, delta, start_date, end_date = await cur.fetchone()
+    # An unconditional increment can't lose an update, so no version check here.
+    await db.execute(
+        "UPDATE leave_balance SET balance_days = balance_days + ?, version = version + 1 "
+        "WHERE employee_email = ?",
+        (-delta, employee_email),
+    )
+    async with db.execute(
+        "SELECT balance_days FROM leave_balance WHERE employee_email = ?", (employee_email,)
+    ) as cur:
+        (balance,) = await cur.fetchone()
+    await db.execute(
+        "INSERT INTO leave_ledger(employee_email, kind, delta_days, balance_after, start_date, end_date, ref_id) "
+        "VALUES (?, 'reversal', ?, ?, ?, ?, ?)",
+        (employee_email, -delta, balance, start_date, end_date, debit_id),
+    )
+    await db.commit()
+    LEDGER_COUNTS["reversals"] += 1
+
+
+async def reverse_open_debits(db: aiosqlite.Connection, idempotency_key: str) -> None:
+    """Reverse the not yet reversed debits of a create_loa request; always commits."""
+    async with db.execute(
+        "SELECT d.id FROM leave_ledger d WHERE d.idempotency_key = ? AND d.kind = 'debit' "
+        "AND NOT EXISTS (SELECT 1 FROM leave_ledger r WHERE r.kind = 'reversal' AND r.ref_id = d.id)",
+        (idempotency_key,),
+    ) as cur:
+        debit_ids = [row[0] async for row in cur]
+    for debit_id in debit_ids:
+        await reverse(db, debit_id)
+    await db.commit()
+
+
+async def set_transaction(db: aiosqlite.Connection, debit_id: int, transaction_id: str) -> None:
+    await db.execute(
+        "UPDATE leave_ledger SET transaction_id = ? WHERE id = ?", (transaction_id, debit_id)
+    )
+    await db.commit()
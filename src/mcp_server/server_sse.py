@@ -1,21 +1,65 @@
 import asyncio
+import os
+from contextlib import asynccontextmanager
+from datetime import date
+from urllib.parse import urlparse
+
 import aiosqlite
 from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
 
 from shared.settings import settings
-from shared.workday_client import WorkdayClient
-from shared.model_schema import LeaveRequest
+from shared.workday_client import WorkdayClient, get_http_client, close_http_client
+from shared.model_schema import (
+    LeaveRequest, EmployeeValidation, LeaveBalance, LeaveBalancePage, CreateLOAResponse, LOALookup,
+)
+from shared.idempotency import loa_idempotency_key
+from shared.ttl_cache import TTLCache
+from shared.sqlite_pool import SQLitePool, apply_pragmas
+from mcp_server import idempotency, ledger
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """
+    Per-process startup/shutdown: open the pooled Workday HTTP client and the
+    SQLite connection pool once and close them cleanly when the server stops.
+    With MCP_WORKERS > 1 this runs in every worker.
+    """
+    get_http_client()
+    await db_pool.open()
+    print(f"[mcp-server] worker {os.getpid()} started")
+    try:
+        yield
+    finally:
+        await db_pool.close()
+        await close_http_client()
+        print(f"[mcp-server] worker {os.getpid()} stopped")
+
+
+mcp = FastMCP(name="loa-mcp-server", lifespan=lifespan)
+workday = WorkdayClient(settings.workday_api_base_url)
+db_pool = SQLitePool(settings.sqlite_path, settings.sqlite_pool_size)
 
-mcp = FastMCP(name="loa-mcp-server")
+# employee_email -> EmployeeSnapshot (active + currently_on_leave)
+employee_cache = TTLCache(
+    maxsize=settings.employee_cache_max_entries,
+    ttl=settings.employee_cache_ttl_seconds,
+)
 
 
 async def init_db():
     async with aiosqlite.connect(settings.sqlite_path) as db:
+        await apply_pragmas(db)  # journal_mode=WAL is persisted in the db file
+        # Take the write lock up front: if several servers start on the same
+        # file, their schema / seed steps run one after another.
+        await db.execute("BEGIN IMMEDIATE")
         await db.execute(
             """
             CREATE TABLE IF NOT EXISTS leave_balance (
               employee_email TEXT PRIMARY KEY,
-              balance_days INTEGER NOT NULL
+              balance_days INTEGER NOT NULL,
+              version INTEGER NOT NULL DEFAULT 0  -- bumped on every change (see ledger.py)
             )
             """
         )
@@ -31,72 +75,232 @@ async def init_db():
             "INSERT OR IGNORE INTO leave_balance(employee_email, balance_days) VALUES (?, ?)",
             ("amps@company.com", 20),
         )
+        await ledger.init_ledger(db)
+        await idempotency.init_idempotency(db)
         await db.commit()
 
 
+def _validation(employee_email: str, active: bool, currently_on_leave: bool) -> EmployeeValidation:
+    return EmployeeValidation(
+        employee_email=employee_email,
+        active=active,
+        currently_on_leave=currently_on_leave,
+        ok_to_create_loa=active and (not currently_on_leave),
+    )
+
+
 @mcp.tool
-async def validate_employee(employee_email: str) -> dict:
-    client = WorkdayClient(settings.workday_api_base_url)
-    status = await client.get_employee_status(employee_email)
-    leave = await client.get_leave_status(employee_email)
+async def validate_employee(employee_email: str) -> EmployeeValidation:
+    snap = await employee_cache.get_or_load(
+        employee_email, lambda: workday.get_employee_snapshot(employee_email)
+    )
+    return _validation(employee_email, snap.active, snap.currently_on_leave)
+
+
+@mcp.tool
+async def validate_employees(employee_emails: list[str]) -> dict[str, EmployeeValidation]:
+    """
+    Bulk form of validate_employee for manager / HR flows.
+    Returns {email: validation} for every requested email.
+    """
+    snaps = await employee_cache.get_or_load_many(employee_emails, workday.get_employee_snapshots)
     return {
-        "employee_email": employee_email,
-        "active": status.active,
-        "currently_on_leave": leave.currently_on_leave,
-        "ok_to_create_loa": status.active and (not leave.currently_on_leave),
+        email: _validation(email, snap.active, snap.currently_on_leave)
+        for email, snap in snaps.items()
     }
 
 
 @mcp.tool
-async def get_leave_balance(employee_email: str) -> dict:
-    async with aiosqlite.connect(settings.sqlite_path) as db:
+async def get_cache_stats() -> dict:
+    """Hit / miss / eviction counters for the employee status cache."""
+    return employee_cache.stats()
+
+
+@mcp.tool
+async def get_leave_balance(employee_email: str) -> LeaveBalance:
+    async with db_pool.acquire() as db:
         async with db.execute(
             "SELECT balance_days FROM leave_balance WHERE employee_email = ?",
             (employee_email,),
         ) as cur:
             row = await cur.fetchone()
 
-    return {
-        "employee_email": employee_email,
-        "balance_days": int(row[0]) if row else 0,
-    }
+    return LeaveBalance(employee_email=employee_email, balance_days=int(row[0]) if row else 0)
 
 
 @mcp.tool
-async def create_loa(employee_email: str, start_date: str, end_date: str, employee_name: str | None = None, reason: str | None = None) -> dict:
+async def get_leave_balances(
+    employee_emails: list[str],
+    cursor: int = 0,
+    page_size: int | None = None,
+) -> LeaveBalancePage:
     """
-    REST tool: calls Workday LOA endpoint (mock for now)
-    Dates must be YYYY-MM-DD
+    Balances for many employees in chunked IN (...) queries.
+    Returns {"balances": {email: balance_days}, "next_cursor": int | None}.
+    Pass page_size to page through very large lists: call again with
+    cursor=next_cursor until it comes back None.
     """
-    from datetime import date
-    from shared.workday_client import WorkdayClient
-    from shared.settings import settings
+    if cursor < 0:
+        raise ToolError("cursor must be 0 or a next_cursor from a previous page")
+    emails = list(dict.fromkeys(employee_emails))  # de-dupe, keep order
+    end = len(emails) if page_size is None else min(len(emails), cursor + max(1, page_size))
+    page = emails[cursor:end]
+
+    balances = dict.fromkeys(page, 0)
+    chunk = max(1, settings.sqlite_in_chunk_size)
+    async with db_pool.acquire() as db:
+        for i in range(0, len(page), chunk):
+            part = page[i:i + chunk]
+            placeholders = ",".join("?" * len(part))
+            async with db.execute(
+                f"SELECT employee_email, balance_days FROM leave_balance "
+                f"WHERE employee_email IN ({placeholders})",
+                part,
+            ) as cur:
+                async for email, days in cur:
+                    balances[email] = int(days)
+
+    return LeaveBalancePage(balances=balances, next_cursor=end if end < len(emails) else None)
 
-    # convert strings to LeaveRequest
-    y1, m1, d1 = map(int, start_date.split("-"))
-    y2, m2, d2 = map(int, end_date.split("-"))
 
+def _parse_date(value: str) -> date:
+    # Dates must be YYYY-MM-DD
+    y, m, d = map(int, value.split("-"))
+    return date(y, m, d)
+
+
+@mcp.tool
+async def find_loa(employee_email: str, start_date: str, end_date: str) -> LOALookup:
+    """
+    The LOA already created for this employee and these dates, if any
+    (same idempotency key as create_loa). transaction_id is None if there is none.
+    """
+    key = loa_idempotency_key(employee_email, _parse_date(start_date), _parse_date(end_date))
+    async with db_pool.acquire() as db:
+        existing = await idempotency.lookup(db, key)
+    if existing is None:
+        return LOALookup(idempotency_key=key)
+    return LOALookup(idempotency_key=key, transaction_id=existing.transaction_id, status=existing.status)
+
+
+@mcp.tool
+async def create_loa(
+    employee_email: str,
+    start_date: str,
+    end_date: str,
+    employee_name: str | None = None,
+    reason: str | None = None,
+    idempotency_key: str | None = None,
+) -> CreateLOAResponse:
+    """
+    REST tool: calls Workday LOA endpoint (mock for now)
+    Dates must be YYYY-MM-DD
+    The requested days (both ends included) are debited from the leave
+    balance first; fails without calling Workday if the balance is too low.
+    Idempotent: repeating a request (same employee and dates, or the same
+    idempotency_key) returns the original transaction.
+    """
     req = LeaveRequest(
         employee_email=employee_email,
         employee_name=employee_name,
-        start_date=date(y1, m1, d1),
-        end_date=date(y2, m2, d2),
+        start_date=_parse_date(start_date),
+        end_date=_parse_date(end_date),
         reason=reason,
     )
+    if req.end_date < req.start_date:
+        raise ToolError("end_date is before start_date")
+    key = idempotency_key or loa_idempotency_key(employee_email, req.start_date, req.end_date)
+
+    try:
+        async with db_pool.acquire() as db:
+            existing, claimed_at = await idempotency.claim(
+                db, key, employee_email, req.start_date, req.end_date
+            )
+            if existing is not None:
+                return existing
+            try:
+                debit_id, balance_after = await ledger.debit(
+                    db, employee_email, req.start_date, req.end_date, key
+                )
+            except BaseException:
+                await idempotency.release(db, key, claimed_at)
+                raise
+    except (
+        ledger.InsufficientBalance, idempotency.RequestInProgress, idempotency.IdempotencyKeyMismatch,
+    ) as e:
+        raise ToolError(str(e)) from e
+
+    # No connection (or lock) is held across the Workday call.
+    try:
+        resp = await workday.create_loa(req, idempotency_key=key)
+    except BaseException:
+        async with db_pool.acquire() as db:
+            await ledger.reverse(db, debit_id)
+            await idempotency.release(db, key, claimed_at)
+        raise
+    async with db_pool.acquire() as db:
+        await idempotency.complete(db, key, resp)
+        await ledger.set_transaction(db, debit_id, resp.transaction_id)
+    # Workday now reports this employee as on leave
+    employee_cache.invalidate(employee_email)
+
+    return CreateLOAResponse(
+        transaction_id=resp.transaction_id, status=resp.status, balance_days=balance_after
+    )
 
-    client = WorkdayClient(settings.workday_api_base_url)
-    resp = await client.create_loa(req)
 
-    return {"transaction_id": resp.transaction_id, "status": resp.status}
+def _transport_options() -> tuple[str, str, dict]:
+    """(transport, path, extra http_app/run kwargs) from settings."""
+    transport = settings.mcp_transport
+    if transport not in ("sse", "streamable-http"):
+        raise ValueError(f"Unsupported MCP_TRANSPORT {transport!r}: use 'sse' or 'streamable-http'")
+    # Serve on the path of the URL the agent is configured to use.
+    url = settings.mcp_http_url if transport == "streamable-http" else settings.mcp_sse_url
+    extra = {}
+    if transport == "streamable-http":
+        # Workers share no memory, so with several of them an MCP session
+        # can't live in one: every request must be self-contained.
+        extra["stateless_http"] = settings.mcp_stateless_http or settings.mcp_workers > 1
+    elif settings.mcp_workers > 1:
+        raise ValueError(
+            "MCP_WORKERS > 1 needs MCP_TRANSPORT=streamable-http: an SSE stream and the "
+            "POSTs for it must reach the same process"
+        )
+    return transport, urlparse(url).path, extra
+
+
+def create_app():
+    """
+    ASGI app for one uvicorn worker process (uvicorn --factory). Its lifespan
+    opens and closes that worker's Workday client and SQLite pool.
+    """
+    transport, path, extra = _transport_options()
+    return mcp.http_app(path=path, transport=transport, **extra)
 
 
 def main():
+    transport, path, extra = _transport_options()
+
+    # Once, in the launching process, before any worker starts.
     asyncio.run(init_db())
+    if settings.mcp_workers > 1:
+        import uvicorn
+
+        uvicorn.run(
+            "mcp_server.server_sse:create_app",
+            factory=True,
+            host=settings.mcp_host,
+            port=settings.mcp_port,
+            workers=settings.mcp_workers,
+        )
+        return
+
     mcp.run(
-        transport="sse",
-        host="127.0.0.1",
-        port=9002,
-        path="/sse",
+        transport=transport,
+        host=settings.mcp_host,
+        port=settings.mcp_port,
+        path=path,
+        **extra,
     )
 
 
@@ -1,5 +1,8 @@
-from fastapi import FastAPI, HTTPException
-from shared.model_schema import LeaveRequest, EmployeeStatus, LeaveStatus, CreateLOAResponse
+from fastapi import FastAPI, Header, HTTPException
+from shared.model_schema import (
+    LeaveRequest, EmployeeStatus, LeaveStatus, CreateLOAResponse,
+    EmployeeSnapshot, EmployeeSnapshotBatchRequest,
+)
 from uuid import uuid4
 
 app = FastAPI(title="Mock Workday API", version="0.1.0")
@@ -12,6 +15,9 @@ EMPLOYEES = {
     "amps@company.com": {"active": True, "on_leave": False},
 }
 
+# Idempotency-Key -> ((employee, start, end), response) of the LOA created with it
+LOA_BY_KEY: dict[str, tuple[tuple, CreateLOAResponse]] = {}
+
 
 @app.get("/employees/status", response_model=EmployeeStatus)
 def employee_status(email: str):
@@ -30,8 +36,37 @@ def leave_status(email: str):
     return LeaveStatus(employee_email=email, currently_on_leave=bool(row["on_leave"]))
 
 
+def _snapshot(email: str) -> EmployeeSnapshot:
+    row = EMPLOYEES.get(email)
+    if not row:
+        return EmployeeSnapshot(employee_email=email, active=False, currently_on_leave=False)
+    return EmployeeSnapshot(
+        employee_email=email,
+        active=bool(row["active"]),
+        currently_on_leave=bool(row["on_leave"]),
+    )
+
+
+@app.get("/employees/snapshot", response_model=EmployeeSnapshot)
+def employee_snapshot(email: str):
+    """Status + leave state in one round trip."""
+    return _snapshot(email)
+
+
+@app.post("/employees/snapshot/batch", response_model=list[EmployeeSnapshot])
+def employee_snapshot_batch(body: EmployeeSnapshotBatchRequest):
+    return [_snapshot(email) for email in body.emails]
+
+
 @app.post("/loa", response_model=CreateLOAResponse)
-def create_loa(req: LeaveRequest):
+def create_loa(req: LeaveRequest, idempotency_key: str | None = Header(default=None)):
+    request_id = (req.employee_email, req.start_date, req.end_date)
+    if idempotency_key and idempotency_key in LOA_BY_KEY:
+        seen, resp = LOA_BY_KEY[idempotency_key]
+        if seen != request_id:
+            raise HTTPException(status_code=422, detail="Idempotency-Key reused with a different request.")
+        return resp
+
     row = EMPLOYEES.get(req.employee_email)
     if not row or not row["active"]:
         raise HTTPException(status_code=400, detail="Employee not active.")
@@ -43,4 +78,7 @@ def create_loa(req: LeaveRequest):
     # mark as on leave for demo
     row["on_leave"] = True
 
-    return CreateLOAResponse(transaction_id=txn, status="IN_REVIEW")
+    resp = CreateLOAResponse(transaction_id=txn, status="IN_REVIEW")
+    if idempotency_key:
+        LOA_BY_KEY[idempotency_key] = (request_id, resp)
+    return resp
@@ -0,0 +1,28 @@
+"""
+Optional process-wide caps on concurrent outbound calls, one semaphore per
+kind ("llm", "mcp"). Calls are unlimited until configure_call_limits() is
+used, e.g. by the batch runner (agent_app/batch.py), so the interactive
+CLI and the UI behave as before.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+_LIMITS: dict[str, asyncio.Semaphore] = {}
+
+
+def configure_call_limits(**limits: int | None) -> None:
+    """e.g. configure_call_limits(llm=8, mcp=32); None / 0 leaves that kind unlimited."""
+    _LIMITS.clear()
+    for kind, n in limits.items():
+        if n:
+            _LIMITS[kind] = asyncio.Semaphore(n)
+
+
+@asynccontextmanager
+async def call_slot(kind: str):
+    sem = _LIMITS.get(kind)
+    if sem is None:
+        yield
+        return
+    async with sem:
+        yield
@@ -1,7 +1,14 @@
+import atexit
+import os
+import queue
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+from shared.settings import settings
+
 
 @dataclass
 class OutboxEmail:
@@ -11,13 +18,140 @@ class OutboxEmail:
     created_at: datetime
 
 
+class _OutboxWriter:
+    """
+    One background writer thread per outbox file.
+    send() only enqueues; the thread drains the queue in batches, appends
+    them to the file, fsyncs per settings.outbox_fsync and rotates by
+    size / age. A plain thread-safe queue keeps this usable from any event
+    loop or thread (CLI, UI, concurrent graph runs).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._file = None
+        self._opened_at = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"outbox-writer:{path.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, text: str) -> None:
+        self._queue.put(text)
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk (per the fsync policy)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        batch_size = max(1, settings.outbox_batch_size)
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._write([item for item in batch if item is not None])
+            except OSError as e:
+                print(f"[OUTBOX] failed to write {len(batch)} email(s) to {self.path}: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._close_file()
+                return
+
+    def _write(self, items: list[str]) -> None:
+        if not items:
+            return
+        self._maybe_rotate()
+        f = self._open()
+        fsync = settings.outbox_fsync
+        for item in items:
+            f.write(item)
+            if fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        f.flush()
+        if fsync == "batch":
+            os.fsync(f.fileno())
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._opened_at = time.monotonic()
+        return self._file
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _maybe_rotate(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size == 0:
+            return
+        too_big = 0 < settings.outbox_max_bytes <= size
+        too_old = (
+            settings.outbox_rotate_seconds > 0
+            and self._file is not None
+            and time.monotonic() - self._opened_at >= settings.outbox_rotate_seconds
+        )
+        if not (too_big or too_old):
+            return
+
+        self._close_file()
+        # Never delete the log being rotated: 0 (or less) still keeps it as .1.
+        backups = max(1, settings.outbox_backup_count)
+        for i in range(backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+_WRITERS: dict[Path, _OutboxWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def _writer_for(path: Path) -> _OutboxWriter:
+    key = path.resolve()
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = _WRITERS[key] = _OutboxWriter(key)
+        return writer
+
+
+@atexit.register
+def close_all_outboxes() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+        _WRITERS.clear()
+    for writer in writers:
+        writer.close()
+
+
 class EmailOutbox:
     """
     Local "SMTP-less" outbox.
-    Writes emails to ./outbox.log so you can test locally.
+    Appends emails to ./outbox.log so you can test locally.
+    All EmailOutbox instances for the same file share one buffered writer.
     """
     def __init__(self, path: str = "./outbox.log"):
         self.path = Path(path)
+        self._writer = _writer_for(self.path)
 
     def send(self, to: str, subject: str, body: str) -> None:
         msg = OutboxEmail(to=to, subject=subject, body=body, created_at=datetime.utcnow())
@@ -26,5 +160,8 @@ class EmailOutbox:
             f"{msg.body}\n"
             f"{'-'*80}\n"
         )
-        self.path.write_text(self.path.read_text() + line if self.path.exists() else line, encoding="utf-8")
-        print(f"[OUTBOX] wrote email to {self.path.resolve()}")
+        self._writer.put(line)
+        print(f"[OUTBOX] queued email for {self._writer.path}")
+
+    def flush(self) -> None:
+        self._writer.flush()
@@ -1,8 +1,10 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
 from shared.model_schema import LeaveRequest
+from shared.call_limits import call_slot
+from shared.llm_clients import get_chain
+from shared.llm_cache import llm_cache, prompt_version
 
 parser = JsonOutputParser(pydantic_object=LeaveRequest)
 
@@ -14,11 +16,21 @@ prompt = ChatPromptTemplate.from_messages(
 ).partial(format_instructions=parser.get_format_instructions())
 
 
+PROMPT_VERSION = prompt_version(prompt, LeaveRequest)
+
+
 async def extract_leave_request_llm(email_from: str, email_body: str) -> LeaveRequest:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    chain = prompt | llm | parser
+    inputs = {"email_from": email_from, "email_body": email_body}
+    return await llm_cache.cached(
+        "extract_leave_request", PROMPT_VERSION, inputs, LeaveRequest, lambda: _extract(inputs)
+    )
+
+
+async def _extract(inputs: dict) -> LeaveRequest:
+    chain = get_chain("extract_leave_request", lambda llm: prompt | llm | parser)
 
-    data= await chain.ainvoke({"email_from": email_from, "email_body": email_body})
+    async with call_slot("llm"):
+        data= await chain.ainvoke(inputs)
 
     if isinstance(data, dict):
         return LeaveRequest(**data)
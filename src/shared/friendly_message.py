@@ -0,0 +1,208 @@
+"""
+Template-first friendly messages for the success / failure email nodes.
+
+The message mostly depends on a few facts (active, currently_on_leave,
+balance bucket, whether we have dates, the reason create_loa was
+rejected), so known outcome classes are rendered locally. Anything else goes to the LLM once per outcome
+signature: the LLM is given placeholder values, and the generic text it
+returns is cached and filled in with the real dates / name for later
+requests with the same signature.
+"""
+from collections import Counter
+from datetime import date
+
+from shared.friendly_message_llm import friendly_message_lln
+from shared.friendly_message_llm_success import friendly_message_lln_success
+from shared.settings import settings
+from shared.ttl_cache import TTLCache
+
+# prompt_vars that vary per employee/request; the LLM only ever sees these
+# placeholders on the cached path.
+_PLACEHOLDERS = {
+    "employee_email": "<<EMPLOYEE_EMAIL>>",
+    "employee_name": "<<EMPLOYEE_NAME>>",
+    "start_date": "<<START_DATE>>",
+    "end_date": "<<END_DATE>>",
+    "reason": "<<REASON>>",
+    "balance_days": "<<BALANCE_DAYS>>",
+}
+
+friendly_cache = TTLCache(
+    maxsize=settings.friendly_cache_max_entries,
+    ttl=settings.friendly_cache_ttl_seconds,
+)
+
+# LLM runs tagged with this produce user-facing text; streaming UIs forward
+# their tokens. The placeholder (cacheable) call also carries the real values
+# under STREAM_FILL_KEY in its run metadata, and its tokens have to go
+# through a PlaceholderFiller before they're shown.
+STREAM_TAG = "user_facing"
+STREAM_FILL_KEY = "placeholder_values"
+_STREAM_CONFIG = {"tags": [STREAM_TAG]}
+
+# "template", "cache" or "llm" per generated message
+FRIENDLY_PATH_COUNTS: Counter = Counter()
+
+
+def _requested_days(prompt_vars: dict) -> int | None:
+    try:
+        start = date.fromisoformat(str(prompt_vars.get("start_date")))
+        end = date.fromisoformat(str(prompt_vars.get("end_date")))
+    except ValueError:
+        return None
+    return (end - start).days + 1
+
+
+def _balance_bucket(outcome: str, prompt_vars: dict) -> str:
+    try:
+        balance = int(prompt_vars.get("balance_days"))
+    except (TypeError, ValueError):
+        return "unknown"
+    if balance <= 0:
+        return "none"
+    if outcome == "success":
+        return "ok"  # already net of this request's days
+    requested = _requested_days(prompt_vars)
+    if requested is not None and balance < requested:
+        return "low"
+    return "ok"
+
+
+def _generic_reason(prompt_vars: dict) -> str | None:
+    """create_loa's failure reason with this request's email / dates as placeholders."""
+    reason = prompt_vars.get("failure_reason")
+    if not reason or reason == "N/A":
+        return None
+    for key in ("employee_email", "start_date", "end_date"):
+        value = str(prompt_vars.get(key) or "")
+        if value and value != "N/A":
+            reason = reason.replace(value, _PLACEHOLDERS[key])
+    return reason
+
+
+def outcome_signature(outcome: str, prompt_vars: dict) -> tuple:
+    has_dates = _requested_days(prompt_vars) is not None
+    return (
+        outcome,
+        prompt_vars.get("active"),
+        prompt_vars.get("currently_on_leave"),
+        _balance_bucket(outcome, prompt_vars),
+        has_dates,
+        _generic_reason(prompt_vars),
+    )
+
+
+def render_template(signature: tuple, prompt_vars: dict) -> str | None:
+    """Message for a known outcome class, or None if the LLM should write it."""
+    outcome, active, on_leave, bucket, has_dates, failure_reason = signature
+    dates = f" for {prompt_vars['start_date']} to {prompt_vars['end_date']}" if has_dates else ""
+
+    if outcome == "success":
+        if not has_dates or bucket in ("none", "low"):
+            return None
+        text = (
+            f"Your leave request{dates} has been created and is now in review. "
+            "You'll receive an update once it has been approved."
+        )
+        if bucket == "ok":
+            text += f" Your current leave balance is {prompt_vars['balance_days']} day(s)."
+        return text
+
+    if failure_reason is not None:
+        return None  # rejected by create_loa: the LLM explains the reason
+    if active is False:
+        return (
+            f"We couldn't create your leave request{dates} because your employee record "
+            "isn't active in Workday. Please contact HR to confirm your employment status, "
+            "then submit the request again."
+        )
+    if active is True and on_leave is True:
+        return (
+            f"We couldn't create your leave request{dates} because you already appear to be "
+            "on leave in Workday. Please check your existing leave dates, or send updated "
+            "dates once your current leave has ended."
+        )
+    if active is True and not has_dates:
+        return (
+            "We couldn't create your leave request because we couldn't find both a start "
+            "and an end date. Please resend it with the dates, for example "
+            "\"leave from 2026-03-01 to 2026-03-03\"."
+        )
+    return None
+
+
+def _fill(text: str, prompt_vars: dict) -> str:
+    for key, placeholder in _PLACEHOLDERS.items():
+        text = text.replace(placeholder, str(prompt_vars.get(key, "")))
+    return text
+
+
+class PlaceholderFiller:
+    """
+    Fills <<PLACEHOLDER>> markers in streamed LLM text with the real values
+    ({placeholder: value}). A marker split across tokens is held back until
+    it is complete. If the text has a marker it can't fill, `mangled` turns
+    True and nothing more is emitted: friendly_message() then asks the LLM
+    again with the real values, in a new run.
+    With no values, text passes through unchanged.
+    """
+
+    def __init__(self, values: dict[str, str] | None = None):
+        self.values = values or {}
+        self.mangled = False
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        if self.mangled:
+            return ""
+        if not self.values:
+            return text
+        self._pending += text
+        hold = self._pending.rfind("<<")
+        if hold == -1 or ">>" in self._pending[hold:]:
+            hold = len(self._pending) - 1 if self._pending.endswith("<") else len(self._pending)
+        out, self._pending = self._pending[:hold], self._pending[hold:]
+        return self._emit(out)
+
+    def flush(self) -> str:
+        out, self._pending = self._pending, ""
+        return "" if self.mangled or not out else self._emit(out)
+
+    def _emit(self, text: str) -> str:
+        for placeholder, value in self.values.items():
+            text = text.replace(placeholder, value)
+        cut = min((i for i in (text.find("<<"), text.find(">>")) if i != -1), default=-1)
+        if cut != -1:
+            self.mangled = True
+            return text[:cut]
+        return text
+
+
+async def friendly_message(outcome: str, prompt_vars: dict) -> str:
+    """outcome is "success" or "failure"; prompt_vars as built by the email nodes."""
+    signature = outcome_signature(outcome, prompt_vars)
+
+    if settings.friendly_templates_enabled:
+        text = render_template(signature, prompt_vars)
+        if text is not None:
+            FRIENDLY_PATH_COUNTS["template"] += 1
+            return text
+
+    cached = friendly_cache.get(signature)
+    if cached is not None:
+        FRIENDLY_PATH_COUNTS["cache"] += 1
+        return _fill(cached, prompt_vars)
+
+    FRIENDLY_PATH_COUNTS["llm"] += 1
+    llm_fn = friendly_message_lln_success if outcome == "success" else friendly_message_lln
+    fill_values = {ph: str(prompt_vars.get(key, "")) for key, ph in _PLACEHOLDERS.items()}
+    generic = await llm_fn(
+        {**prompt_vars, **_PLACEHOLDERS, "failure_reason": signature[-1] or "N/A"},
+        config={**_STREAM_CONFIG, "metadata": {STREAM_FILL_KEY: fill_values}},
+    )
+    text = _fill(generic, prompt_vars)
+    if "<<" in text or ">>" in text:
+        # The LLM mangled a placeholder: don't cache, ask again with the real values.
+        return await llm_fn(prompt_vars, config=_STREAM_CONFIG)
+    friendly_cache.set(signature, generic)
+    return text
@@ -1,8 +1,10 @@
 
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
+from shared.call_limits import call_slot
+from shared.llm_clients import get_chain
+
 FAILURE_PROMPT = ChatPromptTemplate.from_messages([
     ("system",
      "You are an HR leave assistant. Write concise, professional messages. "
@@ -17,13 +19,15 @@ FAILURE_PROMPT = ChatPromptTemplate.from_messages([
      "- Active employee: {active}\n"
      "- Currently on leave: {currently_on_leave}\n"
      "- Leave balance days: {balance_days}\n"
+     "Reason given by the leave system (optional): {failure_reason}\n"
      "Create a message to the employee explaining why the LOA was not created and what to do next."
      )
 ])
 
 
-async def friendly_message_lln(prompt_vars) -> str:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    llm_msg = await llm.ainvoke(FAILURE_PROMPT.format_messages(**prompt_vars))
+async def friendly_message_lln(prompt_vars, config=None) -> str:
+    chain = get_chain("friendly_message_failure", lambda llm: FAILURE_PROMPT | llm)
+    async with call_slot("llm"):
+        llm_msg = await chain.ainvoke(prompt_vars, config=config)
     friendly_text = llm_msg.content.strip()
     return friendly_text
\ No newline at end of file
@@ -1,8 +1,10 @@
 
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
+from shared.call_limits import call_slot
+from shared.llm_clients import get_chain
+
 FAILURE_PROMPT = ChatPromptTemplate.from_messages([
     ("system",
      "You are an HR leave assistant. Write concise, professional messages for successfully creation of leave. "
@@ -21,8 +23,9 @@ FAILURE_PROMPT = ChatPromptTemplate.from_messages([
 ])
 
 
-async def friendly_message_lln_success(prompt_vars) -> str:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    llm_msg = await llm.ainvoke(FAILURE_PROMPT.format_messages(**prompt_vars))
+async def friendly_message_lln_success(prompt_vars, config=None) -> str:
+    chain = get_chain("friendly_message_success", lambda llm: FAILURE_PROMPT | llm)
+    async with call_slot("llm"):
+        llm_msg = await chain.ainvoke(prompt_vars, config=config)
     friendly_text = llm_msg.content.strip()
     return friendly_text
\ No newline at end of file
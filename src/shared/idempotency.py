@@ -0,0 +1,11 @@
+import hashlib
+from datetime import date
+
+
+def loa_idempotency_key(employee_email: str, start_date: date | str, end_date: date | str) -> str:
+    """
+    Same employee + same dates -> same key, however often the request is resent.
+    Used by the agent, the MCP create_loa tool and the Workday Idempotency-Key header.
+    """
+    raw = f"{employee_email.strip().lower()}|{start_date}|{end_date}"
+    return "loa-" + hashlib.sha256(raw.encode()).hexdigest()[:32]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pydantic import Field
+from langchain_core.prompts import ChatPromptTemplate
+
+from shared.intent_llm import IntentOut
+from shared.call_limits import call_slot
+from shared.llm_clients import get_chain
+from shared.llm_cache import llm_cache, prompt_version
+from shared.model_schema import LeaveRequest
+
+
+class IntentWithRequestOut(IntentOut):
+    leave_request: LeaveRequest | None = Field(
+        default=None,
+        description="Only for intent 'create_loa': the leave details found in the message. "
+                    "Dates must be ISO YYYY-MM-DD. Use the thread email as employee_email "
+                    "unless the message names another employee email. Null otherwise.",
+    )
+
+
+prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system",
+         "You are an intent classifier and leave-request extractor for an HR Leave assistant.\n"
+         "Return JSON matching the schema.\n"
+         "Rules:\n"
+         "- balance: user asks remaining leave days, leave balance, PTO balance.\n"
+         "- create_loa: user asks to create/apply/request leave of absence, provides dates or asks to take leave.\n"
+         "- unknown: greetings, unrelated, or unclear.\n"
+         "Be strict: choose only one intent.\n"
+         "When the intent is create_loa, also fill leave_request from the message; "
+         "leave it null if the start or end date is missing."),
+        ("human", "Thread id (employee email): {email_from}\nUser message: {text}"),
+    ]
+)
+
+
+PROMPT_VERSION = prompt_version(prompt, IntentWithRequestOut)
+
+
+async def classify_and_extract_llm(email_from: str, text: str) -> IntentWithRequestOut:
+    """
+    One structured-output call that returns the intent and, for create_loa,
+    the LeaveRequest, replacing classify_intent_llm + extract_leave_request_llm.
+    """
+    inputs = {"email_from": email_from, "text": text}
+    return await llm_cache.cached(
+        "classify_and_extract", PROMPT_VERSION, inputs, IntentWithRequestOut,
+        lambda: _classify_and_extract(inputs),
+    )
+
+
+async def _classify_and_extract(inputs: dict) -> IntentWithRequestOut:
+    chain = get_chain(
+        "classify_and_extract", lambda llm: prompt | llm.with_structured_output(IntentWithRequestOut)
+    )
+    async with call_slot("llm"):
+        res = await chain.ainvoke(inputs)
+    if res.intent != "create_loa":
+        res.leave_request = None
+    return res
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from typing import Literal
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from dotenv import load_dotenv
 
+from shared.call_limits import call_slot
+from shared.llm_clients import get_chain
+from shared.llm_cache import llm_cache, prompt_version
+
 load_dotenv()
 
 class IntentOut(BaseModel):
@@ -33,16 +35,22 @@ prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0,
-)
+
+PROMPT_VERSION = prompt_version(prompt, IntentOut)
 
 
 async def classify_intent_llm(email_from: str, text: str) -> IntentOut:
+    inputs = {"email_from": email_from, "text": text}
+    return await llm_cache.cached(
+        "classify_intent", PROMPT_VERSION, inputs, IntentOut, lambda: _classify(inputs)
+    )
+
+
+async def _classify(inputs: dict) -> IntentOut:
     # structured output is the cleanest (no JSON parsing headaches)
-    chain = prompt | llm.with_structured_output(IntentOut)
-    res= await chain.ainvoke({"email_from": email_from, "text": text})
+    chain = get_chain("classify_intent", lambda llm: prompt | llm.with_structured_output(IntentOut))
+    async with call_slot("llm"):
+        res= await chain.ainvoke(inputs)
     return res
 
 
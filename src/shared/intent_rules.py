@@ -0,0 +1,125 @@
+"""
+Deterministic fast-path intent classifier.
+
+Scores a message against a small lexicon (balance phrasing, leave verbs /
+nouns, explicit date ranges) and returns an IntentOut with a confidence.
+node_route_intent only calls classify_intent_llm when the confidence is
+below settings.intent_fast_path_threshold.
+"""
+import re
+from collections import Counter
+
+from shared.intent_llm import IntentOut
+
+_MONTH = (
+    r"\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b\.?"
+)
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_DATE = (
+    rf"(?:\d{{4}}-\d{{1,2}}-\d{{1,2}}"           # 2026-03-01
+    rf"|\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?"       # 03/01/2026
+    rf"|{_DAY}\s+(?:of\s+)?{_MONTH}"              # 3rd March / 3rd of March
+    rf"|{_MONTH}\s+{_DAY}\b"                      # March 3rd
+    rf"|\b(?:mon|tues|wednes|thurs|fri|satur|sun)day\b|\btomorrow\b)"
+)
+_DATE_RANGE = re.compile(
+    rf"{_DATE}.{{0,40}}?\b(?:to|till|until|through|thru)\b\s*{_DATE}|{_DATE}\s*-\s*{_DATE}", re.I
+)
+_ANY_DATE = re.compile(_DATE, re.I)
+
+_BALANCE_STRONG = re.compile(
+    r"\b(?:leave|pto|vacation|holiday|sick|time[- ]off)\s+balance\b"
+    r"|\bbalance\s+(?:of\s+)?(?:my\s+)?(?:leave|pto|vacation|days)\b"
+    r"|\bhow\s+(?:many|much)\s+(?:leave|pto|vacation|holiday|days?|time[- ]off)\b.*\b(?:left|remaining|have|available)\b"
+    r"|\b(?:remaining|available)\s+(?:leave|pto|vacation|days)\b",
+    re.I,
+)
+_BALANCE_WEAK = re.compile(r"\bbalance\b|\bdays?\s+left\b", re.I)
+
+_LEAVE_NOUN = re.compile(
+    r"\b(?:leave|loa|pto|vacation|holiday|time[- ]off|days?\s+off|off|absence)\b", re.I
+)
+_LEAVE_VERB = re.compile(
+    r"\b(?:apply|applying|request|requesting|create|book|take|taking|file|submit|need|want)\b",
+    re.I,
+)
+_LEAVE_FROM = re.compile(r"\b(?:leave|off|pto|vacation|loa)\s+(?:from|on|starting|between)\b", re.I)
+# Mention leave + dates but don't ask for a new one: leave those to the LLM.
+_CANCEL = re.compile(
+    r"\b(?:cancel\w*|withdraw\w*|revok\w*|retract\w*|undo|delete|remove|reschedul\w*|postpon\w*"
+    r"|chang\w*|modif\w*|amend\w*|extend\w*|shorten\w*)\b",
+    re.I,
+)
+_STATUS = re.compile(
+    r"\b(?:approved|approval|rejected|denied|declined|accepted|status|pending|processed|went\s+through)\b"
+    r"|^\s*(?:was|were|did|has|have|is|are)\b.*\?\s*$",
+    re.I | re.S,
+)
+_NEGATION = re.compile(
+    r"\b(?:not|never|no\s+longer|any\s*more|don['’]?t|doesn['’]?t|didn['’]?t|won['’]?t"
+    r"|can['’]?t|cannot|shouldn['’]?t)\b",
+    re.I,
+)
+_GREETING = re.compile(
+    r"^\s*(?:hi|hello|hey|thanks|thank\s+you|good\s+(?:morning|afternoon|evening))\b[\s!.,]*$", re.I
+)
+
+# "fast_path:<intent>" when the rules decided, "llm" when we fell back.
+INTENT_PATH_COUNTS: Counter = Counter()
+
+
+def classify_intent_rules(text: str) -> IntentOut:
+    text = (text or "").strip()
+    if not text or _GREETING.match(text):
+        return IntentOut(intent="unknown", confidence=0.9, reason="rules: greeting / empty")
+
+    balance = 0.0
+    if _BALANCE_STRONG.search(text):
+        balance = 0.95
+    elif _BALANCE_WEAK.search(text):
+        balance = 0.7
+
+    create = 0.0
+    reason = ""
+    has_noun = bool(_LEAVE_NOUN.search(text))
+    has_verb = bool(_LEAVE_VERB.search(text))
+    has_range = bool(_DATE_RANGE.search(text))
+    if has_noun and (_LEAVE_FROM.search(text) or has_verb):
+        create, reason = 0.8, "leave verb"
+    elif has_noun and _ANY_DATE.search(text):
+        create, reason = 0.75, "leave noun + date"
+    if create and has_range:
+        create = 0.97
+        reason = "leave verb + date range" if reason == "leave verb" else "leave noun + date range"
+    elif has_range and has_verb:
+        create, reason = 0.6, "request verb + date range"
+
+    if create:
+        for guard, label in ((_CANCEL, "cancel / change"), (_STATUS, "status question"), (_NEGATION, "negation")):
+            if guard.search(text):
+                # Never a fast-path create: the LLM decides what is being asked.
+                return IntentOut(intent="unknown", confidence=0.3, reason=f"rules: {label} wording")
+
+    if balance and create:
+        # Mentions both (e.g. "if my balance allows, book leave 3-5 March"): let the LLM decide.
+        return IntentOut(intent="unknown", confidence=0.3, reason="rules: balance and create signals")
+    if balance:
+        return IntentOut(intent="balance", confidence=balance, reason="rules: balance phrasing")
+    if create:
+        return IntentOut(
+            intent="create_loa",
+            confidence=create,
+            reason=f"rules: {reason}",
+        )
+    return IntentOut(intent="unknown", confidence=0.0, reason="rules: no signal")
+
+
+def intent_path_stats() -> dict:
+    fast = sum(n for path, n in INTENT_PATH_COUNTS.items() if path.startswith("fast_path:"))
+    total = fast + INTENT_PATH_COUNTS["llm"]
+    return {
+        **INTENT_PATH_COUNTS,
+        "total": total,
+        "llm_skipped_rate": round(fast / total, 4) if total else 0.0,
+    }
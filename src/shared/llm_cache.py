@@ -0,0 +1,241 @@
+"""
+On-disk, content-addressed cache for deterministic LLM calls (intent and
+extraction run at temperature 0), so a resent email or a resubmitted form
+never reaches the LLM twice.
+
+The key is a SHA-256 over the model settings, the prompt version and the
+normalized input. The prompt version is itself a hash of the prompt
+template and the output schema, so editing either one changes every key;
+rows written under an older version are deleted the first time the new
+version is used. Entries expire after settings.llm_cache_ttl_seconds and
+the least recently used are evicted above settings.llm_cache_max_entries;
+the size limit is enforced every few writes, not on each one, so the table
+can briefly hold a few more rows.
+
+Stored in SQLite through the stdlib driver, so the connection isn't tied to
+an event loop (the agent runs graphs on more than one); get() / set() run
+the queries in a worker thread (asyncio.to_thread) to keep them off the
+loop.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Awaitable, Callable, TypeVar
+
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from shared.settings import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def prompt_version(prompt: ChatPromptTemplate, output: type[BaseModel]) -> str:
+    """Hash of the prompt messages, partial variables and output schema."""
+    spec = {
+        "messages": [
+            [type(m).__name__, getattr(getattr(m, "prompt", None), "template", repr(m))]
+            for m in prompt.messages
+        ],
+        "partials": {k: str(v) for k, v in prompt.partial_variables.items()},
+        "output": output.model_json_schema(),
+    }
+    raw = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def normalize_text(text: str) -> str:
+    """Unicode forms and whitespace (incl. line breaks) don't change the meaning."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def normalize_inputs(inputs: dict[str, str]) -> dict[str, str]:
+    return {
+        k: (v or "").strip().lower() if k == "email_from" else normalize_text(v)
+        for k, v in inputs.items()
+    }
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM results keyed by (model, prompt version, input).
+    A ttl or max_entries of 0 (or less) disables caching.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._db: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._versions: set[tuple[str, str]] = set()  # (name, version) already purged for
+        self._writes = 0
+        # Enforce max_entries every this many writes (at most 1% over the limit).
+        self._evict_every = max(1, min(100, max_entries // 100))
+        # hits / misses per chain name; expirations / evictions / invalidations overall
+        self.counts: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")  # before WAL
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                  key TEXT PRIMARY KEY,
+                  name TEXT NOT NULL,
+                  prompt_version TEXT NOT NULL,
+                  value TEXT NOT NULL,
+                  expires_at REAL NOT NULL,
+                  last_used REAL NOT NULL,
+                  hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache(last_used)")
+            self._db = db
+        return self._db
+
+    def key(self, name: str, version: str, inputs: dict[str, str]) -> str:
+        raw = json.dumps(
+            {
+                "model": settings.llm_model,
+                "temperature": settings.llm_temperature,
+                "name": name,
+                "prompt_version": version,
+                "input": normalize_inputs(inputs),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _purge_old_versions(self, db: sqlite3.Connection, name: str, version: str) -> None:
+        if (name, version) in self._versions:
+            return
+        cur = db.execute(
+            "DELETE FROM llm_cache WHERE name = ? AND prompt_version != ?", (name, version)
+        )
+        self.counts["invalidations"] += cur.rowcount
+        self._versions.add((name, version))
+
+    async def get(self, name: str, version: str, key: str) -> str | None:
+        return await asyncio.to_thread(self._get, name, version, key)
+
+    async def set(self, name: str, version: str, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, name, version, key, value)
+
+    def _get(self, name: str, version: str, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            self._purge_old_versions(db, name, version)
+            row = db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] <= now:
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.counts["expirations"] += 1
+                row = None
+            if row is None:
+                self.counts[f"{name}:misses"] += 1
+                return None
+            db.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self.counts[f"{name}:hits"] += 1
+            return row[0]
+
+    def _set(self, name: str, version: str, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, name, prompt_version, value, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, name, version, value, now + self.ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self._evict_every == 0:
+                self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        cur = db.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY last_used "
+            "LIMIT max(0, (SELECT COUNT(*) FROM llm_cache) - ?))",
+            (self.max_entries,),
+        )
+        self.counts["evictions"] += cur.rowcount
+
+    async def cached(
+        self,
+        name: str,
+        version: str,
+        inputs: dict[str, str],
+        output: type[M],
+        call: Callable[[], Awaitable[M]],
+    ) -> M:
+        """output.model_validate_json(cached value), or await call() and store its result."""
+        if not self.enabled:
+            return await call()
+        key = self.key(name, version, inputs)
+        value = await self.get(name, version, key)
+        if value is not None:
+            return output.model_validate_json(value)
+        result = await call()
+        await self.set(name, version, key, result.model_dump_json())
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn().execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        per_name: dict[str, dict[str, Any]] = {}
+        for counter, n in self.counts.items():
+            name, sep, kind = counter.partition(":")
+            if sep:
+                per_name.setdefault(name, {"hits": 0, "misses": 0})[kind] = n
+        for entry in per_name.values():
+            lookups = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = round(entry["hits"] / lookups, 4) if lookups else 0.0
+
+        hits = sum(e["hits"] for e in per_name.values())
+        lookups = hits + sum(e["misses"] for e in per_name.values())
+        size = 0
+        if self.enabled:
+            with self._lock:
+                size = self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.counts["evictions"],
+            "expirations": self.counts["expirations"],
+            "invalidations": self.counts["invalidations"],
+            "by_name": per_name,
+        }
+
+
+llm_cache = LLMCache(
+    settings.llm_cache_path,
+    max_entries=settings.llm_cache_max_entries,
+    ttl=settings.llm_cache_ttl_seconds,
+)
@@ -0,0 +1,60 @@
+import asyncio
+from typing import Callable
+
+import httpx
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+from shared.settings import settings
+
+# One ChatOpenAI (and one pooled HTTP client to the LLM endpoint) per process,
+# plus the chains built on it. httpx pools are tied to the event loop that
+# created them, so everything is rebuilt if we get called from a new loop.
+_LOOP: asyncio.AbstractEventLoop | None = None
+_LLM: ChatOpenAI | None = None
+_CHAINS: dict[str, Runnable] = {}
+
+
+def _build_llm() -> ChatOpenAI:
+    http_async_client = httpx.AsyncClient(
+        timeout=settings.llm_timeout,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+        ),
+    )
+    return ChatOpenAI(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+        http_async_client=http_async_client,
+    )
+
+
+def _check_loop() -> None:
+    global _LOOP, _LLM
+    loop = asyncio.get_running_loop()
+    if _LOOP is not loop:
+        _LOOP = loop
+        _LLM = None
+        _CHAINS.clear()
+
+
+def get_llm() -> ChatOpenAI:
+    """Shared chat model, created lazily on first use. Call from async code."""
+    global _LLM
+    _check_loop()
+    if _LLM is None:
+        _LLM = _build_llm()
+    return _LLM
+
+
+def get_chain(name: str, build: Callable[[ChatOpenAI], Runnable]) -> Runnable:
+    """
+    Compile a chain once per process and reuse it.
+    `build` receives the shared model, e.g. lambda llm: prompt | llm | parser
+    """
+    llm = get_llm()
+    chain = _CHAINS.get(name)
+    if chain is None:
+        chain = _CHAINS[name] = build(llm)
+    return chain
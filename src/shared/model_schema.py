@@ -19,6 +19,44 @@ class LeaveStatus(BaseModel):
     currently_on_leave: bool
 
 
+class EmployeeSnapshot(BaseModel):
+    employee_email: EmailStr
+    active: bool
+    currently_on_leave: bool
+
+
+class EmployeeSnapshotBatchRequest(BaseModel):
+    emails: list[str]
+
+
 class CreateLOAResponse(BaseModel):
     transaction_id: str = Field(..., description="Workday transaction id / reference id")
     status: str = "IN_REVIEW"
+    balance_days: int | None = Field(
+        default=None, description="Leave balance after this request's debit (MCP create_loa only)"
+    )
+
+
+# MCP tool outputs (declared as the tools' output schemas; the agent decodes
+# the structured content straight into these).
+class EmployeeValidation(BaseModel):
+    employee_email: str
+    active: bool
+    currently_on_leave: bool
+    ok_to_create_loa: bool
+
+
+class LeaveBalance(BaseModel):
+    employee_email: str
+    balance_days: int
+
+
+class LeaveBalancePage(BaseModel):
+    balances: dict[str, int]
+    next_cursor: int | None = None
+
+
+class LOALookup(BaseModel):
+    idempotency_key: str
+    transaction_id: str | None = None  # None: no completed create_loa for these dates
+    status: str | None = None
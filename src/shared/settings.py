@@ -4,6 +4,94 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8",extra="allow")
     workday_api_base_url: str = "http://127.0.0.1:9001"
     mcp_sse_url: str = "http://127.0.0.1:9002/sse"
+    # MCP transport for both the server and the agent: "sse" or "streamable-http".
+    # "in-process" (agent only) calls the mcp_server.server_sse tools in the agent's own process.
+    mcp_transport: str = "sse"
+    mcp_http_url: str = "http://127.0.0.1:9002/mcp"  # used with streamable-http
+    mcp_stateless_http: bool = False  # streamable-http without server-side sessions (no LB affinity)
+    # MCP server process (python -m mcp_server.server_sse)
+    mcp_host: str = "127.0.0.1"
+    mcp_port: int = 9002
+    mcp_workers: int = 1  # > 1 needs streamable-http (served stateless); workers share the SQLite/WAL file
+    mcp_tool_timeout_seconds: float = 15.0  # per tool call from the agent graph
+    # Agent-side pool of persistent MCP sessions (see agent_app/mcp_pool.py)
+    mcp_session_pool_size: int = 4
+    mcp_session_connect_timeout_seconds: float = 10.0
+    mcp_session_idle_check_seconds: float = 30.0  # ping a session idle longer than this before reuse
+    mcp_ping_timeout_seconds: float = 2.0
+    mcp_read_timeout_seconds: float = 10.0  # per request on a pooled session; then retried once on a new one
+    # Start validate_employee/get_leave_balance for email_from while intent is classified
+    speculative_prefetch: bool = False
+    # Stream node progress + friendly-message tokens in the CLI / Streamlit UI
+    stream_responses: bool = True
+    prefetch_max_age_seconds: float = 300.0
     sqlite_path: str = "./loa.db"
 
+    # LangGraph checkpointer: "sqlite" (durable, see agent_app/checkpointer.py) or "memory"
+    checkpointer_backend: str = "sqlite"
+    checkpoint_sqlite_path: str = "./agent_memory.db"
+    checkpoint_serializer: str = "jsonplus"  # "jsonplus" (LangGraph default) | "compact" (plain msgpack)
+    checkpoint_max_per_thread: int = 20  # 0 keeps every checkpoint
+    checkpoint_ttl_seconds: float = 30 * 24 * 3600  # drop threads idle this long (0 disables)
+    checkpoint_maintenance_interval_seconds: float = 600.0  # prune + vacuum (0 disables)
+
+    # Shared LLM client (see shared/llm_clients.py)
+    llm_model: str = "gpt-4o-mini"
+    llm_temperature: float = 0.0
+    llm_timeout: float = 60.0
+    llm_max_connections: int = 50
+    llm_max_keepalive_connections: int = 10
+
+    # Rule-based intent fast path: skip the LLM at or above this confidence (> 1 disables)
+    intent_fast_path_threshold: float = 0.85
+    # "two_call": classify_intent_llm then extract_leave_request_llm
+    # "combined": one call returns intent + LeaveRequest (see intent_extraction_llm.py)
+    intent_extraction_mode: str = "two_call"
+
+    # Friendly messages: local templates first, LLM text cached per outcome signature
+    friendly_templates_enabled: bool = True
+    friendly_cache_max_entries: int = 256
+    friendly_cache_ttl_seconds: float = 24 * 3600
+
+    # On-disk cache of intent / extraction LLM results (see shared/llm_cache.py; ttl <= 0 disables)
+    llm_cache_path: str = "./llm_cache.db"
+    llm_cache_max_entries: int = 10_000
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+
+    # Shared Workday HTTP client (one pooled httpx.AsyncClient per process)
+    workday_timeout: float = 10.0
+    workday_connect_timeout: float = 5.0
+    workday_max_connections: int = 100
+    workday_max_keepalive_connections: int = 20
+    workday_keepalive_expiry: float = 30.0
+    workday_http2: bool = False  # needs the optional `h2` package
+    workday_snapshot_batch_size: int = 500  # emails per POST /employees/snapshot/batch
+
+    # MCP server cache of Workday employee/leave status (ttl <= 0 disables)
+    employee_cache_ttl_seconds: float = 60.0
+    employee_cache_max_entries: int = 10_000
+
+    # MCP server SQLite connection pool
+    sqlite_pool_size: int = 4
+    sqlite_synchronous: str = "NORMAL"  # NORMAL is durable enough under WAL
+    sqlite_cache_size_kib: int = 16_384
+    sqlite_busy_timeout_ms: int = 5_000
+    sqlite_cached_statements: int = 256
+    sqlite_in_chunk_size: int = 500  # bound parameters per IN (...) query
+    ledger_max_retries: int = 20  # create_loa debit attempts when concurrent updates win
+    loa_claim_lease_seconds: float = 120.0  # unfinished create_loa claim older than this can be taken over
+
+    # EmailOutbox writer
+    outbox_batch_size: int = 512  # max emails appended per write
+    outbox_fsync: str = "batch"  # "always" | "batch" | "never"
+    outbox_max_bytes: int = 10 * 1024 * 1024  # rotate above this size (0 disables)
+    outbox_rotate_seconds: float = 0.0  # also rotate after this long (0 disables)
+    outbox_backup_count: int = 5  # outbox.log.1 .. outbox.log.N (0 or less keeps only .1)
+
+    # Batch ingestion (python -m agent_app.batch)
+    batch_concurrency: int = 16  # messages in flight
+    batch_llm_concurrency: int = 8  # concurrent LLM calls across those messages
+    batch_mcp_concurrency: int = 32  # concurrent MCP tool calls
+    batch_report_every: int = 100  # print throughput every N messages (0 disables)
+
 settings = Settings()
@@ -0,0 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import aiosqlite
+
+from shared.settings import settings
+
+
+async def apply_pragmas(db: aiosqlite.Connection) -> None:
+    """WAL lets readers run alongside a writer; the rest trades fsyncs / memory for speed."""
+    # busy_timeout first: switching to WAL needs a lock, and other workers
+    # starting on the same file may hold it for a moment.
+    await db.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    await db.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    await db.execute("PRAGMA temp_store=MEMORY")
+
+
+async def connect(path: str) -> aiosqlite.Connection:
+    # sqlite3 keeps a per-connection LRU of prepared statements, so
+    # long-lived connections skip re-preparing the same SQL text.
+    db = await aiosqlite.connect(path, cached_statements=settings.sqlite_cached_statements)
+    await apply_pragmas(db)
+    return db
+
+
+class SQLitePool:
+    """
+    Small pool of long-lived aiosqlite connections.
+    Open it once at startup (or lazily on first acquire) and close it on shutdown.
+    Connections are bound to the event loop that opened them.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._conns: list[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        async with self._open_lock:
+            if self._idle is not None:
+                return
+            idle: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+            for _ in range(self.size):
+                db = await connect(self.path)
+                self._conns.append(db)
+                idle.put_nowait(db)
+            self._idle = idle
+
+    async def close(self) -> None:
+        async with self._open_lock:
+            conns, self._conns, self._idle = self._conns, [], None
+            for db in conns:
+                await db.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self._idle is None:
+            await self.open()
+        idle = self._idle
+        db = await idle.get()
+        try:
+            yield db
+        finally:
+            idle.put_nowait(db)
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Sequence
+
+_MISSING = object()
+
+
+async def _item(batch: Awaitable[Sequence[Any]], i: int) -> Any:
+    return (await batch)[i]
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+    get_or_load() / get_or_load_many() collapse concurrent misses for the same
+    key into one load.
+    A ttl of 0 (or less) disables caching.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not self.enabled:
+            self.misses += 1
+            return default
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        # Dropping the in-flight marker stops a load that started before the
+        # invalidation from writing its (possibly stale) result back.
+        self._inflight.pop(key, None)
+        if self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        # Like invalidate(): loads already running don't write back.
+        self._inflight.clear()
+        self._data.clear()
+
+    def _track(self, key: Hashable, load: asyncio.Future) -> asyncio.Future:
+        self._inflight[key] = load
+        load.add_done_callback(lambda done: self._loaded(key, done))
+        return load
+
+    def _loaded(self, key: Hashable, load: asyncio.Future) -> None:
+        if self._inflight.get(key) is not load:
+            return  # invalidated while loading: don't write the result back
+        del self._inflight[key]
+        if not load.cancelled() and load.exception() is None:
+            self.set(key, load.result())
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        load = self._inflight.get(key)
+        if load is None:
+            # The load runs in its own task, so a caller that gets cancelled
+            # doesn't cancel it for everyone else waiting on the same key.
+            load = self._track(key, asyncio.ensure_future(loader()))
+        return await asyncio.shield(load)
+
+    async def get_or_load_many(
+        self, keys: Iterable[Hashable], loader: Callable[[list], Awaitable[Sequence[Any]]]
+    ) -> dict[Hashable, Any]:
+        """
+        get_or_load() for several keys: the keys neither cached nor already
+        loading are loaded with one loader(missing_keys) call, which returns
+        their values in the same order.
+        """
+        keys = list(dict.fromkeys(keys))
+        values: dict[Hashable, Any] = {}
+        loads: dict[Hashable, asyncio.Future] = {}
+        missing = []
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                values[key] = value
+            elif key in self._inflight:
+                loads[key] = self._inflight[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            batch = asyncio.ensure_future(loader(missing))
+            for i, key in enumerate(missing):
+                loads[key] = self._track(key, asyncio.ensure_future(_item(batch, i)))
+
+        results = await asyncio.gather(*(asyncio.shield(load) for load in loads.values()))
+        values.update(zip(loads, results))
+        return {key: values[key] for key in keys}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
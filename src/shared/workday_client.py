@@ -1,25 +1,124 @@
+import asyncio
+
 import httpx
-from shared.model_schema import EmployeeStatus, LeaveStatus, CreateLOAResponse, LeaveRequest
+from shared.model_schema import (
+    EmployeeStatus, LeaveStatus, CreateLOAResponse, LeaveRequest, EmployeeSnapshot,
+)
+from shared.settings import settings
+
+_HTTP_CLIENT: httpx.AsyncClient | None = None
+
+
+def _http2_enabled() -> bool:
+    if not settings.workday_http2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        print("[workday] workday_http2 is set but `h2` is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.workday_timeout, connect=settings.workday_connect_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.workday_max_connections,
+            max_keepalive_connections=settings.workday_max_keepalive_connections,
+            keepalive_expiry=settings.workday_keepalive_expiry,
+        ),
+        http2=_http2_enabled(),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Long-lived, per-process pooled client with keep-alive.
+    Created lazily so it binds to the event loop that first uses it.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = build_http_client()
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
 
 
 class WorkdayClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, client: httpx.AsyncClient | None = None):
         self.base_url = base_url.rstrip("/")
+        self._client = client
+        self._snapshot_supported = True  # flipped off if the API has no snapshot endpoint
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_http_client()
 
     async def get_employee_status(self, employee_email: str) -> EmployeeStatus:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{self.base_url}/employees/status", params={"email": employee_email})
-            r.raise_for_status()
-            return EmployeeStatus(**r.json())
+        r = await self.client.get(f"{self.base_url}/employees/status", params={"email": employee_email})
+        r.raise_for_status()
+        return EmployeeStatus(**r.json())
 
     async def get_leave_status(self, employee_email: str) -> LeaveStatus:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(f"{self.base_url}/employees/leave-status", params={"email": employee_email})
-            r.raise_for_status()
-            return LeaveStatus(**r.json())
-
-    async def create_loa(self, req: LeaveRequest) -> CreateLOAResponse:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.post(f"{self.base_url}/loa", json=req.model_dump(mode="json"))
-            r.raise_for_status()
-            return CreateLOAResponse(**r.json())
+        r = await self.client.get(f"{self.base_url}/employees/leave-status", params={"email": employee_email})
+        r.raise_for_status()
+        return LeaveStatus(**r.json())
+
+    async def get_employee_snapshot(self, employee_email: str) -> EmployeeSnapshot:
+        """Active + leave state for one employee in a single round trip."""
+        snapshots = await self.get_employee_snapshots([employee_email])
+        return snapshots[0]
+
+    async def get_employee_snapshots(self, employee_emails: list[str]) -> list[EmployeeSnapshot]:
+        """
+        Active + leave state for many employees, in input order.
+        Uses POST /employees/snapshot/batch (chunked); if the API doesn't have it,
+        falls back to concurrent status + leave-status calls per employee.
+        """
+        if not employee_emails:
+            return []
+        if self._snapshot_supported:
+            size = max(1, settings.workday_snapshot_batch_size)
+            chunks = [employee_emails[i:i + size] for i in range(0, len(employee_emails), size)]
+            try:
+                results = await asyncio.gather(*(self._post_snapshot_batch(c) for c in chunks))
+                return [snap for chunk in results for snap in chunk]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (404, 405):
+                    raise
+                print("[workday] snapshot endpoint not available; falling back to per-employee calls")
+                self._snapshot_supported = False
+        return list(await asyncio.gather(*(self._snapshot_fallback(e) for e in employee_emails)))
+
+    async def _post_snapshot_batch(self, employee_emails: list[str]) -> list[EmployeeSnapshot]:
+        r = await self.client.post(
+            f"{self.base_url}/employees/snapshot/batch", json={"emails": employee_emails}
+        )
+        r.raise_for_status()
+        return [EmployeeSnapshot(**row) for row in r.json()]
+
+    async def _snapshot_fallback(self, employee_email: str) -> EmployeeSnapshot:
+        status, leave = await asyncio.gather(
+            self.get_employee_status(employee_email),
+            self.get_leave_status(employee_email),
+        )
+        return EmployeeSnapshot(
+            employee_email=employee_email,
+            active=status.active,
+            currently_on_leave=leave.currently_on_leave,
+        )
+
+    async def create_loa(self, req: LeaveRequest, idempotency_key: str | None = None) -> CreateLOAResponse:
+        """With an idempotency_key, a retried request returns the original transaction."""
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        r = await self.client.post(
+            f"{self.base_url}/loa", json=req.model_dump(mode="json"), headers=headers
+        )
+        r.raise_for_status()
+        return CreateLOAResponse(**r.json())
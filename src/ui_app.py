@@ -1,14 +1,37 @@
-import asyncio
 import uuid
 import streamlit as st
-from langgraph.checkpoint.memory import InMemorySaver
 
 # ✅ Agent lives in agent.py (your existing file)
 from agent_app.agent import build_graph
+from agent_app.background_loop import BackgroundLoop
+from agent_app.checkpointer import open_checkpointer
+from agent_app.mcpClient import get_mcp_tool_by_name
+from agent_app.streaming import stream_turn, NODE_LABELS
+from shared.settings import settings
 
 st.set_page_config(page_title="Leave Agent", page_icon="🧑‍💼", layout="centered")
 st.title("🧑‍💼 Leave Agent")
 
+# ---------------------------
+# Process-wide resources (shared by every browser session)
+# ---------------------------
+@st.cache_resource
+def get_background_loop() -> BackgroundLoop:
+    return BackgroundLoop()
+
+
+@st.cache_resource
+def get_app():
+    """Compiled graph shared by all sessions; threads are isolated by thread_id."""
+    loop = get_background_loop()
+    # Opened on the shared loop, which lives as long as the process.
+    checkpointer = loop.run(open_checkpointer())
+    app = build_graph(checkpointer)
+    # Open the MCP session on the shared loop up front, not on the first message.
+    loop.run(get_mcp_tool_by_name())
+    return app
+
+
 # ---------------------------
 # Session init
 # ---------------------------
@@ -21,9 +44,7 @@ if "messages" not in st.session_state:
 if "email_from" not in st.session_state:
     st.session_state.email_from = ""
 
-if "app" not in st.session_state:
-    checkpointer = InMemorySaver()
-    st.session_state.app = build_graph(checkpointer)
+st.session_state.app = get_app()
 
 
 # ---------------------------
@@ -65,20 +86,45 @@ for m in st.session_state.messages:
 # ---------------------------
 # Run agent (async -> sync wrapper)
 # ---------------------------
-async def _run_agent(user_text: str) -> dict:
-    app = st.session_state.app
-    thread_id = st.session_state.thread_id
+def _turn(user_text: str) -> tuple[dict, dict]:
     email_from = (st.session_state.email_from or "unknown@company.com").strip()
-
-    return await app.ainvoke(
-        {"email_from": email_from, "email_body": user_text},
-        config={"configurable": {"thread_id": thread_id}},
-    )
+    inputs = {"email_from": email_from, "email_body": user_text}
+    config = {"configurable": {"thread_id": st.session_state.thread_id}}
+    return inputs, config
 
 
 def run_agent(user_text: str) -> dict:
-    # Streamlit runs sync; safest is asyncio.run per call
-    return asyncio.run(_run_agent(user_text))
+    # Streamlit runs sync; run on the shared background loop so the MCP
+    # session and HTTP keep-alive pools survive between messages.
+    # (st.session_state is only readable from this thread, hence _turn here.)
+    inputs, config = _turn(user_text)
+    return get_background_loop().run(st.session_state.app.ainvoke(inputs, config=config))
+
+
+def run_agent_streaming(user_text: str, status, placeholder) -> dict:
+    """Streamlit elements must be updated from this (script) thread, so the
+    stream runs on the background loop and events are rendered here."""
+    inputs, config = _turn(user_text)
+    text = ""
+    events = stream_turn(st.session_state.app, inputs, config)
+    for kind, value in get_background_loop().iterate(events):
+        if kind == "node":
+            status.update(label=f"{NODE_LABELS.get(value, value)}...")
+        elif kind == "token":
+            text += value
+            placeholder.markdown(text + "▌")
+        elif kind == "reset":
+            text = ""
+            placeholder.markdown("▌")
+        else:
+            status.update(label="Done", state="complete")
+            return value
+    return {}
+
+
+def _dump(model):
+    """Typed tool result from the graph state (None if not fetched) as JSON."""
+    return model.model_dump(mode="json") if model is not None else None
 
 
 # ---------------------------
@@ -94,8 +140,14 @@ if prompt:
 
     # call agent
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            result = run_agent(prompt)
+        if settings.stream_responses:
+            status = st.status("Thinking...")
+            placeholder = st.empty()
+            result = run_agent_streaming(prompt, status, placeholder)
+        else:
+            placeholder = st
+            with st.spinner("Thinking..."):
+                result = run_agent(prompt)
 
         # Prefer standard keys from your nodes
         assistant_text = (
@@ -105,7 +157,7 @@ if prompt:
             or "Done."
         )
 
-        st.markdown(assistant_text)
+        placeholder.markdown(assistant_text)
         st.session_state.messages.append({"role": "assistant", "content": assistant_text})
 
         if debug:
@@ -114,8 +166,8 @@ if prompt:
             st.json(
                 {
                     "intent": result.get("intent"),
-                    "validate_employee": result.get("validate_employee"),
-                    "get_leave_balance": result.get("get_leave_balance"),
+                    "validation": _dump(result.get("validation")),
+                    "balance": _dump(result.get("balance")),
                     "loa_created": result.get("loa_created"),
                     "ok": result.get("ok"),
                     "error": result.get("error"),
@@ -0,0 +1,78 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server import server_sse
+from shared.model_schema import CreateLOAResponse
+from shared.settings import settings
+from shared.sqlite_pool import SQLitePool
+
+
+class FakeWorkday:
+    """In-process stand-in for WorkdayClient.create_loa."""
+
+    def __init__(self):
+        self.calls = []
+        self.fail_next = 0  # this many calls raise before succeeding again
+        self.gate: asyncio.Event | None = None  # calls wait for it when set
+
+    async def create_loa(self, req, idempotency_key=None) -> CreateLOAResponse:
+        self.calls.append((req, idempotency_key))
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("Workday is down")
+        return CreateLOAResponse(transaction_id=f"LOA-{uuid.uuid4().hex[:10]}", status="SUBMITTED")
+
+
+@pytest.fixture
+def mcp_server(tmp_path, monkeypatch):
+    """
+    mcp_server.server_sse on a fresh SQLite file with a fake Workday.
+    Run coroutines with .run(); the pool is opened and closed inside it.
+    """
+    monkeypatch.setattr(settings, "sqlite_path", str(tmp_path / "loa.db"))
+    pool = SQLitePool(settings.sqlite_path, 4)
+    workday = FakeWorkday()
+    monkeypatch.setattr(server_sse, "db_pool", pool)
+    monkeypatch.setattr(server_sse, "workday", workday)
+    create_loa = getattr(server_sse.create_loa, "fn", server_sse.create_loa)
+
+    def run(coro_fn):
+        async def scenario():
+            await server_sse.init_db()
+            try:
+                return await coro_fn()
+            finally:
+                await pool.close()
+
+        return asyncio.run(scenario())
+
+    return SimpleNamespace(run=run, pool=pool, workday=workday, create_loa=create_loa)
+
+
+async def seed(pool: SQLitePool, email: str, balance: int) -> None:
+    async with pool.acquire() as db:
+        await db.execute(
+            "INSERT INTO leave_balance(employee_email, balance_days) VALUES (?, ?)", (email, balance)
+        )
+        await db.execute(
+            "INSERT INTO leave_ledger(employee_email, kind, delta_days, balance_after) "
+            "VALUES (?, 'opening', ?, ?)",
+            (email, balance, balance),
+        )
+        await db.commit()
+
+
+async def balance_of(pool: SQLitePool, email: str) -> tuple[int, int]:
+    """(materialized balance, sum of the ledger deltas)"""
+    async with pool.acquire() as db:
+        async with db.execute(
+            "SELECT (SELECT balance_days FROM leave_balance WHERE employee_email = ?), "
+            "(SELECT SUM(delta_days) FROM leave_ledger WHERE employee_email = ?)",
+            (email, email),
+        ) as cur:
+            return tuple(await cur.fetchone())
@@ -0,0 +1,40 @@
+from shared.friendly_message import PlaceholderFiller
+
+VALUES = {"<<EMPLOYEE_NAME>>": "Alice", "<<START_DATE>>": "2026-03-01"}
+
+
+def stream(filler, tokens):
+    out = "".join(filler.feed(t) for t in tokens)
+    return out + filler.flush()
+
+
+def test_markers_split_across_tokens_are_filled():
+    filler = PlaceholderFiller(VALUES)
+    tokens = ["Hi <", "<EMPLOYEE", "_NAME>", ">, your leave from <<START_DATE>>", " is in review."]
+    assert stream(filler, tokens) == "Hi Alice, your leave from 2026-03-01 is in review."
+    assert not filler.mangled
+
+
+def test_partial_marker_is_held_back():
+    filler = PlaceholderFiller(VALUES)
+    assert filler.feed("Hi <<EMPLOY") == "Hi "
+    assert filler.feed("EE_NAME>>!") == "Alice!"
+
+
+def test_unknown_marker_is_never_emitted():
+    filler = PlaceholderFiller(VALUES)
+    out = stream(filler, ["Hi <<EMPLOYEE NAME>>", ", more text"])
+    assert out == "Hi "
+    assert filler.mangled
+
+
+def test_unclosed_marker_at_end_is_never_emitted():
+    filler = PlaceholderFiller(VALUES)
+    out = stream(filler, ["Dates: <<START_DA"])
+    assert out == "Dates: "
+    assert filler.mangled
+
+
+def test_without_values_text_passes_through():
+    filler = PlaceholderFiller()
+    assert stream(filler, ["a <", "< b"]) == "a << b"
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from conftest import balance_of, seed
+from mcp_server import idempotency, ledger
+from shared.settings import settings
+
+EMAIL = "emp@company.com"
+START, END = "2026-03-02", "2026-03-03"
+
+
+def test_repeated_request_returns_the_original_transaction(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        first = await mcp_server.create_loa(EMAIL, START, END)
+        again = await mcp_server.create_loa(EMAIL, START, END)
+        assert again.transaction_id == first.transaction_id
+        assert len(mcp_server.workday.calls) == 1
+        assert await balance_of(mcp_server.pool, EMAIL) == (8, 8)
+
+    mcp_server.run(scenario)
+
+
+def test_concurrent_same_key_request_is_in_progress(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        mcp_server.workday.gate = asyncio.Event()
+        first = asyncio.create_task(mcp_server.create_loa(EMAIL, START, END))
+        while not mcp_server.workday.calls:  # first one is waiting on Workday
+            await asyncio.sleep(0.01)
+        with pytest.raises(ToolError, match="already being processed"):
+            await mcp_server.create_loa(EMAIL, START, END)
+        mcp_server.workday.gate.set()
+        await first
+        assert len(mcp_server.workday.calls) == 1
+        assert await balance_of(mcp_server.pool, EMAIL) == (8, 8)
+
+    mcp_server.run(scenario)
+
+
+def test_explicit_key_reused_for_other_dates_is_rejected(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        await mcp_server.create_loa(EMAIL, START, END, idempotency_key="k1")
+        with pytest.raises(ToolError, match="already used"):
+            await mcp_server.create_loa(EMAIL, START, "2026-03-04", idempotency_key="k1")
+        async with mcp_server.pool.acquire() as db:
+            with pytest.raises(idempotency.IdempotencyKeyMismatch):
+                await idempotency.claim(db, "k1", "other@company.com", date(2026, 3, 2), date(2026, 3, 3))
+
+    mcp_server.run(scenario)
+
+
+def test_expired_lease_is_reclaimed_and_its_debit_reversed(mcp_server, monkeypatch):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        start, end = date(2026, 3, 2), date(2026, 3, 3)
+        async with mcp_server.pool.acquire() as db:
+            # A request that claimed and debited, then died before Workday answered.
+            _, claimed_at = await idempotency.claim(db, "k1", EMAIL, start, end)
+            await ledger.debit(db, EMAIL, start, end, "k1")
+            with pytest.raises(idempotency.RequestInProgress):
+                await idempotency.claim(db, "k1", EMAIL, start, end)
+
+            monkeypatch.setattr(settings, "loa_claim_lease_seconds", 0.0)
+            await asyncio.sleep(0.01)
+            existing, reclaimed_at = await idempotency.claim(db, "k1", EMAIL, start, end)
+            assert existing is None and reclaimed_at > claimed_at
+        assert await balance_of(mcp_server.pool, EMAIL) == (10, 10)
+
+        resp = await mcp_server.create_loa(EMAIL, START, END, idempotency_key="k1")
+        assert resp.balance_days == 8
+        assert await balance_of(mcp_server.pool, EMAIL) == (8, 8)
+
+    mcp_server.run(scenario)
+
+
+def test_release_after_workday_failure_lets_a_retry_succeed(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        mcp_server.workday.fail_next = 1
+        with pytest.raises(RuntimeError):
+            await mcp_server.create_loa(EMAIL, START, END)
+        resp = await mcp_server.create_loa(EMAIL, START, END)
+        assert resp.transaction_id.startswith("LOA-")
+        assert len(mcp_server.workday.calls) == 2
+        assert await balance_of(mcp_server.pool, EMAIL) == (8, 8)
+
+    mcp_server.run(scenario)
+
+
+def test_release_only_drops_its_own_claim(mcp_server):
+    async def scenario():
+        start, end = date(2026, 3, 2), date(2026, 3, 3)
+        async with mcp_server.pool.acquire() as db:
+            _, claimed_at = await idempotency.claim(db, "k1", EMAIL, start, end)
+            await idempotency.release(db, "k1", claimed_at - 1)  # a stale owner's release
+            with pytest.raises(idempotency.RequestInProgress):
+                await idempotency.claim(db, "k1", EMAIL, start, end)
+            await idempotency.release(db, "k1", claimed_at)
+            existing, _ = await idempotency.claim(db, "k1", EMAIL, start, end)  # free again
+            assert existing is None
+
+    mcp_server.run(scenario)
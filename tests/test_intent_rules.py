@@ -0,0 +1,54 @@
+import pytest
+
+from shared.intent_rules import classify_intent_rules
+from shared.settings import settings
+
+FAST = settings.intent_fast_path_threshold
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Please create leave from 2026-03-01 to 2026-03-03",
+        "I'd like to take leave from March 3 to March 5",
+        "Please book PTO 3rd of March till 5th of March",
+    ],
+)
+def test_leave_request_with_range_is_fast_path_create(text):
+    out = classify_intent_rules(text)
+    assert out.intent == "create_loa"
+    assert out.confidence >= FAST
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Please cancel my leave from 2026-03-01 to 2026-03-03",
+        "Was my leave from 2026-03-01 to 2026-03-03 approved?",
+        "I don't want to take leave from March 3 to March 5 anymore",
+        "Can you move my leave from March 3 to March 5? I need to change it",
+        "Is the office open from Monday to Friday?",
+    ],
+)
+def test_not_a_new_request_never_takes_the_fast_path(text):
+    out = classify_intent_rules(text)
+    assert out.intent != "create_loa" or out.confidence < FAST
+
+
+def test_range_without_request_verb_is_no_create_hint():
+    out = classify_intent_rules("Is the office open from Monday to Friday?")
+    assert out.intent == "unknown"
+    assert "leave verb" not in out.reason
+
+
+def test_month_needs_a_real_month_name():
+    # "mar..." / "dec..." used to match as months, making this a date range.
+    out = classify_intent_rules("Please book leave from market 3 to decide 5")
+    assert "date range" not in out.reason
+    assert out.confidence < FAST
+
+
+def test_balance_question():
+    out = classify_intent_rules("What is my leave balance?")
+    assert out.intent == "balance"
+    assert out.confidence >= FAST
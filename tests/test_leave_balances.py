@@ -0,0 +1,27 @@
+import pytest
+from fastmcp.exceptions import ToolError
+
+from mcp_server import server_sse
+
+get_leave_balances = getattr(server_sse.get_leave_balances, "fn", server_sse.get_leave_balances)
+EMAILS = ["alice@company.com", "bob@company.com", "nobody@company.com"]
+
+
+def test_pages_cover_every_email_once(mcp_server):
+    async def scenario():
+        seen, cursor = {}, 0
+        while cursor is not None:
+            page = await get_leave_balances(EMAILS, cursor=cursor, page_size=2)
+            seen.update(page.balances)
+            cursor = page.next_cursor
+        return seen
+
+    assert mcp_server.run(scenario) == {"alice@company.com": 12, "bob@company.com": 3, "nobody@company.com": 0}
+
+
+def test_negative_cursor_is_rejected(mcp_server):
+    async def scenario():
+        with pytest.raises(ToolError, match="cursor"):
+            await get_leave_balances(EMAILS, cursor=-1, page_size=2)
+
+    mcp_server.run(scenario)
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from conftest import balance_of, seed
+from mcp_server import ledger
+
+EMAIL = "emp@company.com"
+DAY = date(2026, 3, 2)
+
+
+def days(i: int, n: int = 1) -> tuple[str, str]:
+    start = DAY + timedelta(days=10 * i)
+    return start.isoformat(), (start + timedelta(days=n - 1)).isoformat()
+
+
+def test_concurrent_debits_cannot_overdraw(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 5)
+
+        async def one(i):
+            async with mcp_server.pool.acquire() as db:
+                await ledger.debit(db, EMAIL, DAY + timedelta(days=i), DAY + timedelta(days=i))
+
+        results = await asyncio.gather(*(one(i) for i in range(20)), return_exceptions=True)
+        assert sum(r is None for r in results) == 5
+        assert all(isinstance(r, ledger.InsufficientBalance) for r in results if r is not None)
+        assert await balance_of(mcp_server.pool, EMAIL) == (0, 0)
+
+    mcp_server.run(scenario)
+
+
+def test_concurrent_create_loa_cannot_overdraw(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 3)
+        results = await asyncio.gather(
+            *(mcp_server.create_loa(EMAIL, *days(i)) for i in range(10)), return_exceptions=True
+        )
+        assert sum(not isinstance(r, Exception) for r in results) == 3
+        assert all(isinstance(r, ToolError) for r in results if isinstance(r, Exception))
+        assert len(mcp_server.workday.calls) == 3
+        assert await balance_of(mcp_server.pool, EMAIL) == (0, 0)
+
+    mcp_server.run(scenario)
+
+
+def test_insufficient_balance_raises_without_writing(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 2)
+        async with mcp_server.pool.acquire() as db:
+            with pytest.raises(ledger.InsufficientBalance) as raised:
+                await ledger.debit(db, EMAIL, DAY, DAY + timedelta(days=2))
+        assert (raised.value.requested, raised.value.available) == (3, 2)
+        with pytest.raises(ToolError, match="Insufficient leave balance"):
+            await mcp_server.create_loa(EMAIL, *days(0, 3))
+        assert mcp_server.workday.calls == []
+        assert await balance_of(mcp_server.pool, EMAIL) == (2, 2)
+
+    mcp_server.run(scenario)
+
+
+def test_failed_workday_call_reverses_the_debit(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 5)
+        mcp_server.workday.fail_next = 1
+        with pytest.raises(RuntimeError):
+            await mcp_server.create_loa(EMAIL, *days(0, 2))
+        assert await balance_of(mcp_server.pool, EMAIL) == (5, 5)
+        async with mcp_server.pool.acquire() as db:
+            async with db.execute(
+                "SELECT kind, delta_days FROM leave_ledger WHERE employee_email = ? ORDER BY id", (EMAIL,)
+            ) as cur:
+                assert await cur.fetchall() == [("opening", 5), ("debit", -2), ("reversal", 2)]
+
+    mcp_server.run(scenario)
+
+
+def test_reverse_twice_gives_the_days_back_once(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 5)
+        async with mcp_server.pool.acquire() as db:
+            debit_id, balance_after = await ledger.debit(db, EMAIL, DAY, DAY + timedelta(days=1))
+            assert balance_after == 3
+            await ledger.reverse(db, debit_id)
+            await ledger.reverse(db, debit_id)
+        assert await balance_of(mcp_server.pool, EMAIL) == (5, 5)
+
+    mcp_server.run(scenario)
+
+
+def test_balance_always_equals_the_sum_of_ledger_deltas(mcp_server):
+    async def scenario():
+        await seed(mcp_server.pool, EMAIL, 10)
+        mcp_server.workday.fail_next = 3  # some requests are reversed
+        await asyncio.gather(
+            *(mcp_server.create_loa(EMAIL, *days(i, 2)) for i in range(12)), return_exceptions=True
+        )
+        balance, ledger_sum = await balance_of(mcp_server.pool, EMAIL)
+        assert balance == ledger_sum
+        assert balance >= 0
+
+    mcp_server.run(scenario)
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from shared.llm_cache import LLMCache
+from shared.model_schema import LeaveBalance
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.db"), max_entries=500, ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_entry_expires_after_ttl(cache):
+    async def scenario():
+        cache.ttl = 0.05
+        await cache.set("intent", "v1", "k", "value")
+        assert await cache.get("intent", "v1", "k") == "value"
+        await asyncio.sleep(0.1)
+        assert await cache.get("intent", "v1", "k") is None
+        assert cache.counts["expirations"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_size_limit_is_enforced_every_few_writes(cache):
+    async def scenario():
+        assert cache._evict_every == 5
+        for i in range(503):
+            await cache.set("intent", "v1", f"k{i}", "value")
+        assert cache.stats()["size"] == 503  # over the limit until the next check
+        for i in range(503, 505):
+            await cache.set("intent", "v1", f"k{i}", "value")
+        assert cache.stats()["size"] == 500
+        assert cache.counts["evictions"] == 5
+        # least recently used went first
+        assert await cache.get("intent", "v1", "k0") is None
+        assert await cache.get("intent", "v1", "k504") == "value"
+
+    asyncio.run(scenario())
+
+
+def test_new_prompt_version_invalidates_old_entries(cache):
+    async def scenario():
+        await cache.set("intent", "v1", "k1", "old")
+        await cache.set("extract", "v1", "k2", "other chain")
+        assert await cache.get("intent", "v2", "k1") is None
+        assert cache.counts["invalidations"] == 1
+        assert await cache.get("extract", "v1", "k2") == "other chain"
+
+    asyncio.run(scenario())
+
+
+def test_cached_calls_once_per_input(cache):
+    async def scenario():
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            return LeaveBalance(employee_email="a@company.com", balance_days=3)
+
+        inputs = {"email_from": "A@company.com ", "text": "my  balance?"}
+        first = await cache.cached("balance", "v1", inputs, LeaveBalance, call)
+        same = {"email_from": "a@company.com", "text": "my balance?"}
+        again = await cache.cached("balance", "v1", same, LeaveBalance, call)
+        assert first == again and calls == 1
+        await cache.cached("balance", "v2", same, LeaveBalance, call)
+        assert calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+from agent_app.mcp_pool import McpSessionPool
+
+
+class FakeSession:
+    def __init__(self, fail: Exception | None = None):
+        self.fail = fail
+        self.calls = 0
+        self._read_stream = SimpleNamespace(_closed=False)
+
+    async def call_tool(self, name, args, read_timeout_seconds=None):
+        self.calls += 1
+        if self.fail is not None:
+            raise self.fail
+        return f"{name} ok"
+
+    async def send_ping(self):
+        if self._read_stream._closed:
+            raise RuntimeError("closed")
+
+
+def factory(sessions: list[FakeSession]):
+    opened = []
+
+    @asynccontextmanager
+    async def open_session():
+        session = sessions[len(opened)]
+        opened.append(session)
+        yield session
+
+    return open_session, opened
+
+
+def test_timed_out_call_is_retried_once_on_a_new_session():
+    async def scenario():
+        timeout = McpError(ErrorData(code=httpx.codes.REQUEST_TIMEOUT, message="timed out"))
+        open_session, opened = factory([FakeSession(timeout), FakeSession()])
+        pool = McpSessionPool(open_session, 1)
+        try:
+            assert await pool.call_tool("get_leave_balance", {}) == "get_leave_balance ok"
+            assert len(opened) == 2
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_second_timeout_is_not_retried_again():
+    async def scenario():
+        open_session, opened = factory([FakeSession(TimeoutError()) for _ in range(3)])
+        pool = McpSessionPool(open_session, 2)
+        try:
+            with pytest.raises(TimeoutError):
+                await pool.call_tool("create_loa", {})
+            assert sum(s.calls for s in opened) == 2
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_whose_reader_ended_is_reconnected_before_use():
+    async def scenario():
+        first, second = FakeSession(), FakeSession()
+        open_session, opened = factory([first, second])
+        pool = McpSessionPool(open_session, 1)
+        try:
+            await pool.call_tool("get_leave_balance", {})
+            first._read_stream._closed = True  # e.g. the server restarted
+            assert pool.stats()["open"] == 0
+            await pool.call_tool("get_leave_balance", {})
+            assert opened == [first, second] and first.calls == 1 and second.calls == 1
+        finally:
+            await pool.close()
+
+    asyncio.run(scenario())
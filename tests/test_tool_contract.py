@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from agent_app.mcpClient import TOOL_OUTPUT_MODELS, check_tool_contract, contract_problems
+from mcp_server.server_sse import mcp
+from shared.model_schema import CreateLOAResponse
+
+
+def server_tools():
+    tools = asyncio.run(mcp.get_tools())
+    return [tool.to_mcp_tool() for tool in tools.values()]
+
+
+def test_server_tools_fit_the_agent_models():
+    check_tool_contract(server_tools())
+
+
+def test_every_tool_the_agent_calls_is_served():
+    served = {tool.name for tool in server_tools()}
+    assert set(TOOL_OUTPUT_MODELS) <= served
+
+
+def schema(model):
+    return model.model_json_schema()
+
+
+def test_extra_and_new_optional_server_fields_are_compatible():
+    class Server(BaseModel):
+        transaction_id: str
+        status: str = "IN_REVIEW"
+        balance_days: int | None = None
+        workday_url: str | None = None
+
+    assert contract_problems(schema(Server), CreateLOAResponse) == []
+
+
+def test_dropped_required_field_is_incompatible():
+    class Server(BaseModel):
+        status: str = "IN_REVIEW"
+
+    problems = contract_problems(schema(Server), CreateLOAResponse)
+    assert any(p.startswith("transaction_id:") for p in problems)
+
+
+def test_changed_type_is_incompatible():
+    class Server(BaseModel):
+        transaction_id: int
+        status: str = "IN_REVIEW"
+
+    problems = contract_problems(schema(Server), CreateLOAResponse)
+    assert problems == ["transaction_id: server sends ['integer'], model accepts ['string']"]
+
+
+def test_missing_tool_is_reported():
+    tools = [tool for tool in server_tools() if tool.name != "create_loa"]
+    with pytest.raises(RuntimeError, match="create_loa"):
+        check_tool_contract(tools)
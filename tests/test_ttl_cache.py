@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from shared.ttl_cache import TTLCache
+
+
+def test_cancelled_first_caller_does_not_cancel_waiters():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        first = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "value"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert calls == 1
+        assert cache.get("k") == "value"
+
+    asyncio.run(scenario())
+
+
+def test_loader_error_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        async def loader():
+            await asyncio.sleep(0)
+            raise RuntimeError("down")
+
+        results = await asyncio.gather(
+            cache.get_or_load("k", loader), cache.get_or_load("k", loader), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.get("k") is None
+
+    asyncio.run(scenario())
+
+
+def test_get_or_load_many_loads_missing_keys_in_one_call():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", "A")
+        calls = []
+
+        async def loader(keys):
+            calls.append(keys)
+            return [k.upper() for k in keys]
+
+        got = await cache.get_or_load_many(["c", "a", "b", "c"], loader)
+        assert got == {"c": "C", "a": "A", "b": "B"}
+        assert list(got) == ["c", "a", "b"]
+        assert calls == [["c", "b"]]
+        assert cache.get("b") == "B"
+
+    asyncio.run(scenario())
+
+
+def test_get_or_load_many_joins_single_key_load_in_flight():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+        batches = []
+
+        async def one():
+            await release.wait()
+            return "A"
+
+        async def many(keys):
+            batches.append(keys)
+            return [k.upper() for k in keys]
+
+        single = asyncio.create_task(cache.get_or_load("a", one))
+        await asyncio.sleep(0)
+        bulk = asyncio.create_task(cache.get_or_load_many(["a", "b"], many))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await bulk == {"a": "A", "b": "B"}
+        assert await single == "A"
+        assert batches == [["b"]]
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_during_bulk_load_keeps_stale_value_out():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def loader(keys):
+            await release.wait()
+            return ["stale" for _ in keys]
+
+        bulk = asyncio.create_task(cache.get_or_load_many(["a"], loader))
+        await asyncio.sleep(0)
+        cache.invalidate("a")
+        release.set()
+        await bulk
+
+        assert cache.get("a") is None
+
+    asyncio.run(scenario())
+
+
+def test_clear_during_load_keeps_stale_value_out():
+    async def scenario():
+        cache = TTLCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return "stale"
+
+        load = asyncio.create_task(cache.get_or_load("a", loader))
+        await asyncio.sleep(0)
+        cache.clear()
+        release.set()
+        assert await load == "stale"
+
+        assert cache.get("a") is None
+
+    asyncio.run(scenario())